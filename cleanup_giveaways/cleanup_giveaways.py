@@ -91,6 +91,14 @@ class CleanupGiveaways(commands.Cog):
                         continue
                     valid_giveaways.append((int(guild_id), int(msgid)))
 
+            # Giveaways imported into the giveaway table no longer live in Config
+            try:
+                records = await GiveawayEntry.raw("SELECT guild_id, message_id FROM giveaway").run()
+            except Exception as exc:
+                log.debug("No giveaway table to check against: ", exc_info=exc)
+                records = []
+            valid_giveaways.extend((row["guild_id"], row["message_id"]) for row in records)
+
             # Check database entries
             db_entries = await GiveawayEntry.select(
                 GiveawayEntry.guild_id, GiveawayEntry.message_id, GiveawayEntry.created_at
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+from logging import getLogger
+from typing import Awaitable, Callable, Dict, Optional
+
+log = getLogger("red.flare.giveaways")
+
+
+class EntrantWriteBuffer:
+    """Write-behind buffer for giveaway entrants.
+
+    Joins and leaves are recorded per giveaway as ``{user_id: weight}``, a
+    weight of 0 marking a leave. Pending changes are written together through
+    ``writer`` every ``interval`` seconds, or sooner once ``max_pending``
+    changes have accumulated.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[Dict[int, Dict[int, int]]], Awaitable[None]],
+        *,
+        interval: float = 1.0,
+        max_pending: int = 100,
+    ) -> None:
+        self._writer = writer
+        self.interval = interval
+        self.max_pending = max_pending
+        self._dirty: Dict[int, Dict[int, int]] = {}
+        self._changes = 0
+        self._flush_now = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def record(self, messageid: int, user_id: int, weight: int) -> None:
+        self._dirty.setdefault(messageid, {})[user_id] = weight
+        self._changes += 1
+        if self._changes >= self.max_pending:
+            self._flush_now.set()
+
+    def discard(self, messageid: int) -> None:
+        self._dirty.pop(messageid, None)
+
+    async def flush(self, messageid: Optional[int] = None) -> None:
+        """Write pending changes, either all of them or those of one giveaway."""
+        async with self._lock:
+            if messageid is None:
+                batch, self._dirty = self._dirty, {}
+                self._changes = 0
+            else:
+                users = self._dirty.pop(messageid, None)
+                batch = {messageid: users} if users else {}
+            if not batch:
+                return
+            try:
+                await self._writer(batch)
+            except BaseException:
+                # Also on cancellation, the batch is no longer in _dirty.
+                for msgid, users in batch.items():
+                    pending = self._dirty.setdefault(msgid, {})
+                    for user_id, weight in users.items():
+                        pending.setdefault(user_id, weight)
+                raise
+            log.debug(f"Flushed entrants for {len(batch)} giveaways")
+
+    async def close(self) -> None:
+        """Stop the flush loop, letting a write in progress finish, then write what is left."""
+        self._closing = True
+        if self._task is not None:
+            self._flush_now.set()
+            await self._task
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.interval)
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as exc:
+                log.error("Error flushing giveaway entrants: ", exc_info=exc)
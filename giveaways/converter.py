@@ -88,7 +88,7 @@ class Args(Converter):
                 "You must specify a duration or end date. Use `--duration` or `-d` or `--end` or `-e`"
             )
 
-        nums = [vals["cost"], vals["joined"], vals["created"], vals["winners"]]
+        nums = [vals["cost"], vals["joined"], vals["created"], vals["winners"], vals["multi"]]
         for val in nums:
             if val is None:
                 continue
@@ -0,0 +1,82 @@
+import asyncio
+import contextlib
+from logging import getLogger
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+import discord
+
+log = getLogger("red.flare.giveaways")
+
+RETRIES = 2
+
+
+class DeliveryPipeline:
+    """Sends the outcome of ended giveaways without holding up the caller.
+
+    The message edit, the announcement and the winner DMs of a giveaway are sent
+    concurrently, with at most ``concurrency`` DMs in flight across all giveaways.
+    Server errors are retried with a short backoff, rate limits are left to
+    discord.py which waits them out per route.
+    """
+
+    def __init__(self, *, concurrency: int = 5) -> None:
+        self._dms = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self.delivered = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def submit(
+        self,
+        messageid: int,
+        *,
+        edit: Callable[[], Awaitable],
+        announce: Optional[Callable[[], Awaitable]] = None,
+        dms: List[Tuple[discord.Member, str]] = (),
+    ) -> asyncio.Task:
+        task = asyncio.create_task(self._deliver(messageid, edit, announce, dms))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def close(self, timeout: float = 10) -> None:
+        """Give pending deliveries ``timeout`` seconds to finish, then cancel them."""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        for task in pending:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _deliver(self, messageid: int, edit, announce, dms) -> None:
+        jobs = [self._retry(edit, f"editing giveaway message {messageid}")]
+        if announce is not None:
+            jobs.append(self._retry(announce, f"announcing giveaway {messageid}"))
+        jobs.extend(self._dm(member, text) for member, text in dms)
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.failed += 1
+                log.error(f"Error delivering the result of giveaway {messageid}: ", exc_info=result)
+            else:
+                self.delivered += 1
+
+    async def _retry(self, send: Callable[[], Awaitable], what: str):
+        for attempt in range(RETRIES + 1):
+            try:
+                return await send()
+            except (discord.NotFound, discord.Forbidden) as exc:
+                log.warning(f"Gave up {what}: {exc}")
+                return None
+            except discord.HTTPException as exc:
+                if exc.status < 500 or attempt == RETRIES:
+                    raise
+                await asyncio.sleep(2**attempt)
+
+    async def _dm(self, member: discord.Member, text: str) -> None:
+        async with self._dms:
+            await self._retry(lambda: member.send(text), f"messaging winner {member.id}")
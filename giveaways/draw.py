@@ -0,0 +1,23 @@
+import heapq
+import math
+import random
+from typing import Iterable, List, Tuple
+
+
+def weighted_sample(
+    entrants: Iterable[Tuple[int, int]], k: int, rng: random.Random = random
+) -> List[int]:
+    """Draw ``k`` distinct user ids, weighted by entry weight, without replacement.
+
+    Uses Efraimidis-Spirakis keys: every ``(user_id, weight)`` pair gets the key
+    ``log(u) / weight`` for a uniform ``u`` in (0, 1], and the ``k`` largest keys win.
+    Runs in O(n log k) for ``n`` entrants. Winners are returned in draw order.
+    """
+    if k <= 0:
+        return []
+    keyed = (
+        (math.log(1.0 - rng.random()) / weight, user_id)
+        for user_id, weight in entrants
+        if weight > 0
+    )
+    return [user_id for _, user_id in heapq.nlargest(k, keyed)]
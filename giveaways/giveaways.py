@@ -1,28 +1,61 @@
 import asyncio
 import contextlib
 import logging
-from copy import deepcopy
-from datetime import datetime, timezone
-from typing import Optional
-from asyncio import Lock
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
 
-import aiohttp
 import discord
 from piccolo.apps.migrations.auto.migration_manager import MigrationManager
 from piccolo.columns import BigInt
 from redbot.core import Config, app_commands, commands
 from redbot.core.commands.converter import TimedeltaConverter
-from redbot.core.utils.chat_formatting import pagify
+from redbot.core.utils.chat_formatting import box, pagify
 from redbot.core.utils.menus import DEFAULT_CONTROLS, menu
 from redbot.core.data_manager import cog_data_path
 
+from .buffer import EntrantWriteBuffer
+from .delivery import DeliveryPipeline
 from .converter import Args
-from .menu import GiveawayButton, GiveawayView
+from .integrations import (
+    DEFAULT_CACHE_TTLS,
+    DEFAULT_CHECK_TIMEOUT,
+    DEFAULT_ENTRY_DEADLINE,
+    Integrations,
+)
+from .http_client import create_session
+from .locks import GiveawayLocks
+from .menu import EntrantsMenu, GiveawayRouter, LabelRefresher, build_view
 from .objects import Giveaway, GiveawayExecError
-from .piccolo_app import DB, GiveawayEntry
+from .registry import GiveawayRegistry
+from .scheduler import GiveawayScheduler
+from .snapshot import dump_giveaways, read_snapshot, write_snapshot
+from .workers import EntryWorkerPool
+from .storage import (
+    count_entrants,
+    create_tables,
+    apply_engine_profile,
+    benchmark_writes,
+    load_active_giveaways,
+    load_entrants,
+    load_entrants_bulk,
+    load_giveaway,
+    mark_giveaways_ended,
+    migrate_legacy_entrants,
+    next_reap_time,
+    reap_ended_giveaways,
+    save_giveaways,
+    write_entrant_changes,
+)
 
 log = logging.getLogger("red.flare.giveaways")
 GIVEAWAY_KEY = "giveaways"
+REAP_BATCH_SIZE = 100
+# Ended giveaways stay in the database this long so they can still be rerolled.
+ENDED_RETENTION = 7 * 24 * 3600
+# Giveaways missed while offline are drawn this many at a time, pausing between draws.
+CATCH_UP_CONCURRENCY = 3
+CATCH_UP_DELAY = 1.0
 
 class Giveaways(commands.Cog):
     """Giveaway Commands"""
@@ -38,54 +71,106 @@ class Giveaways(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=95932766180343808)
         self.config.init_custom(GIVEAWAY_KEY, 2)
-        self.giveaways = {}
-        self.locks = {}
+        self.config.register_global(
+            flush_interval=1.0,
+            flush_threshold=100,
+            cache_ttls=DEFAULT_CACHE_TTLS,
+            label_interval=5.0,
+            tombstones=[],
+            metadata_imported=False,
+            engine_profile="default",
+            entry_workers=8,
+            entry_queue=1000,
+            check_timeout=DEFAULT_CHECK_TIMEOUT,
+            entry_deadline=DEFAULT_ENTRY_DEADLINE,
+        )
+        self.giveaways = GiveawayRegistry()
+        self.locks = GiveawayLocks()
+        self.scheduler = GiveawayScheduler()
+        self.entrant_buffer = EntrantWriteBuffer(write_entrant_changes)
+        self.entrant_buffer.start()
+        self.label_refresher = LabelRefresher()
+        self.delivery = DeliveryPipeline()
+        self.router = GiveawayRouter(self)
+        self.entry_pool = EntryWorkerPool(self.router.process, on_drop=self.router.reject)
+        self.entry_pool.start()
+        self.reaper = None
+        self.overdue: List[Giveaway] = []
+        self.loaded = False
+        self.catch_up_task = None
         self.giveaway_bgloop = asyncio.create_task(self.init())
-        self.session = aiohttp.ClientSession()
+        self.session = create_session()
+        self.integrations = Integrations(bot, self.session)
         with contextlib.suppress(Exception):
             self.bot.add_dev_env_value("giveaways", lambda x: self)
-        self.view = GiveawayView(self)
-        self.bot.add_view(self.view)
 
     async def init(self) -> None:
         await self.bot.wait_until_ready()
         try:
-            async with DB.transaction():
-                await GiveawayEntry.create_table(if_not_exists=True).run()
-                log.info("GiveawayEntry table created or verified.")
+            await create_tables()
+            log.info("Giveaway tables created or verified.")
         except Exception as exc:
-            log.error("Failed to create or verify GiveawayEntry table: ", exc_info=exc)
+            log.error("Failed to create or verify giveaway tables: ", exc_info=exc)
             raise
-        log.info("Loading giveaways from config...")
+        profile = await self.config.engine_profile()
+        try:
+            journal_mode = await apply_engine_profile(profile)
+            log.info(f"Using the {profile} database profile, journal mode {journal_mode}.")
+        except Exception as exc:
+            log.error(f"Failed to apply the {profile} database profile: ", exc_info=exc)
+        try:
+            await migrate_legacy_entrants()
+        except Exception as exc:
+            log.error("Failed to migrate legacy giveaway entrants: ", exc_info=exc)
+        self.entrant_buffer.interval = await self.config.flush_interval()
+        self.entrant_buffer.max_pending = await self.config.flush_threshold()
+        self.integrations.set_ttls(await self.config.cache_ttls())
+        self.integrations.check_timeout = await self.config.check_timeout()
+        self.integrations.entry_deadline = await self.config.entry_deadline()
+        self.integrations.start()
+        self.label_refresher.interval = await self.config.label_interval()
+        self.entry_pool.resize(await self.config.entry_workers(), await self.config.entry_queue())
+        try:
+            await self.import_config_giveaways()
+        except Exception as exc:
+            log.error("Failed to import giveaways from config: ", exc_info=exc)
+            raise
+        try:
+            await self.import_tombstones()
+        except Exception as exc:
+            log.error("Failed to import queued giveaway cleanups from config: ", exc_info=exc)
+        await self.load_giveaways()
+        self.reaper = asyncio.create_task(self.reap_loop())
+        if self.overdue:
+            self.catch_up_task = asyncio.create_task(self.catch_up())
+        while True:
+            due = await self.scheduler.wait_for_due()
+            try:
+                await self.check_giveaways(due)
+            except Exception as exc:
+                log.error("Exception in giveaway loop: ", exc_info=exc)
+
+    async def import_config_giveaways(self) -> None:
+        """Move giveaways stored in config into the giveaway table, once."""
+        if await self.config.metadata_imported():
+            return
         data = await self.config.custom(GIVEAWAY_KEY).all()
-        log.debug(f"Config data: {data}")
-        if not data:
-            log.warning("No giveaway data found in config.")
+        active = []
+        ended = []
         for guild_id, guild in data.items():
-            log.debug(f"Processing guild {guild_id} with giveaways: {guild}")
             for msgid, giveaway in guild.items():
                 try:
-                    log.debug(f"Loading giveaway {msgid}: {giveaway}")
-                    if giveaway.get("ended", False):
-                        log.debug(f"Giveaway {msgid} is marked as ended, skipping.")
-                        continue
                     # Handle legacy 'title' key by mapping to 'prize'
                     if "title" in giveaway and "prize" not in giveaway:
                         log.warning(f"Giveaway {msgid} uses legacy 'title' key, mapping to 'prize'.")
                         giveaway["prize"] = giveaway["title"]
                     if not all(key in giveaway for key in ["guildid", "channelid", "messageid", "endtime", "prize", "emoji"]):
-                        log.error(f"Giveaway {msgid} missing required keys: {giveaway}")
+                        log.error(f"Giveaway {msgid} missing required keys, not importing: {giveaway}")
                         continue
                     try:
                         endtime = datetime.fromtimestamp(giveaway["endtime"], tz=timezone.utc)
-                        log.debug(f"Parsed endtime for giveaway {msgid}: {endtime}")
                     except (TypeError, ValueError) as exc:
-                        log.error(f"Invalid endtime for giveaway {msgid}: {exc}")
-                        continue
-                    if endtime < datetime.now(timezone.utc):
-                        log.warning(f"Giveaway {msgid} endtime {endtime} is in the past, marking as ended.")
-                        giveaway["ended"] = True
-                        await self.config.custom(GIVEAWAY_KEY, guild_id, str(msgid)).set(giveaway)
+                        log.error(f"Invalid endtime for giveaway {msgid}, not importing: {exc}")
                         continue
                     giveaway_obj = Giveaway(
                         giveaway["guildid"],
@@ -96,144 +181,242 @@ class Giveaways(commands.Cog):
                         giveaway["emoji"],
                         **giveaway.get("kwargs", {}),
                     )
+                    (ended if giveaway.get("ended", False) else active).append(giveaway_obj)
+                except Exception as exc:
+                    log.error(f"Error importing giveaway {msgid}: ", exc_info=exc)
+        await save_giveaways(active)
+        await save_giveaways(ended, ended=True)
+        if ended:
+            await mark_giveaways_ended((gw.messageid for gw in ended), time.time() + ENDED_RETENTION)
+        await self.config.custom(GIVEAWAY_KEY).clear()
+        await self.config.metadata_imported.set(True)
+        log.info(f"Imported {len(active)} active and {len(ended)} ended giveaways from config.")
+
+    async def import_tombstones(self) -> None:
+        """Move the cleanup queue once kept in config onto the giveaway rows."""
+        tombstones = await self.config.tombstones()
+        if not tombstones:
+            return
+        now = time.time()
+        # Giveaways ended together share a due time, entries queued before retention existed have none.
+        by_due = {}
+        for tombstone in tombstones:
+            by_due.setdefault(tombstone[2] if len(tombstone) > 2 else now, []).append(tombstone[1])
+        for due, message_ids in by_due.items():
+            await mark_giveaways_ended(message_ids, due)
+        await self.config.tombstones.clear()
+        log.info(f"Moved {len(tombstones)} queued giveaway cleanups into the database.")
+
+    async def load_giveaways(self) -> None:
+        """Load active giveaways and their entrants.
+
+        The snapshot written on unload is used when it is still current, otherwise
+        everything is read from the database in bulk.
+        """
+        timings = {}
+        start = time.perf_counter()
+        try:
+            snapshot = await asyncio.to_thread(read_snapshot)
+        except Exception as exc:
+            log.error("Error reading the giveaway snapshot: ", exc_info=exc)
+            snapshot = None
+        timings["snapshot"] = time.perf_counter() - start
+        if snapshot is not None:
+            log.info("Loading giveaways from the unload snapshot...")
+            loaded = {giveaway_obj.messageid: giveaway_obj for giveaway_obj in snapshot}
+        else:
+            loaded = await self.load_giveaways_from_database(timings)
+            if loaded is None:
+                return
+
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        for msgid, giveaway_obj in loaded.items():
+            if giveaway_obj.endtime < now:
+                self.overdue.append(giveaway_obj)
+                continue
+            self.giveaways[msgid] = giveaway_obj
+            self.scheduler.schedule(msgid, giveaway_obj.endtime)
+            if giveaway_obj.kwargs.get("mee6_level") is not None:
+                self.integrations.mee6.warm(giveaway_obj.guildid)
+        timings["register"] = time.perf_counter() - start
+        log.info(
+            f"Loaded {len(self.giveaways)} active giveaways in "
+            + ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in timings.items())
+        )
+        self.loaded = True
+        if self.overdue:
+            log.warning(f"{len(self.overdue)} giveaways ended while the bot was offline, drawing them now.")
+        log.debug(f"Active giveaways: {list(self.giveaways.keys())}")
+
+    async def load_giveaways_from_database(self, timings: dict) -> Optional[dict]:
+        start = time.perf_counter()
+        log.info("Loading giveaways from the database...")
+        loaded = {giveaway_obj.messageid: giveaway_obj for giveaway_obj in await load_active_giveaways()}
+        timings["metadata"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            entrants = await load_entrants_bulk(loaded)
+        except Exception as exc:
+            log.error("Error loading giveaway entrants: ", exc_info=exc)
+            return None
+        for msgid, giveaway_obj in loaded.items():
+            giveaway_obj.entrants = entrants[msgid]
+        timings["database"] = time.perf_counter() - start
+        return loaded
+
+    async def catch_up(self) -> None:
+        """Draw the giveaways that ended while the bot was offline, oldest first.
+
+        At most ``CATCH_UP_CONCURRENCY`` are drawn at once, each waiting for its
+        result to be sent, so a long backlog is spread out instead of hitting
+        Discord's rate limits all at once.
+        """
+        self.overdue.sort(key=lambda gw: gw.endtime)
+        semaphore = asyncio.Semaphore(CATCH_UP_CONCURRENCY)
+
+        async def draw(giveaway: Giveaway) -> None:
+            async with semaphore:
+                delivery = None
+                async with self.locks(giveaway.messageid):
+                    late = datetime.now(timezone.utc) - giveaway.endtime
+                    log.info(f"Catching up on giveaway {giveaway.messageid}, {late.total_seconds():.0f}s late.")
                     try:
-                        entry = await GiveawayEntry.objects().get(
-                            GiveawayEntry.message_id == int(msgid)
-                        )
-                        if entry:
-                            if not isinstance(entry.created_at, datetime):
-                                log.warning(f"Invalid created_at for giveaway {msgid}, resetting.")
-                                entry.created_at = datetime.now(timezone.utc)
-                                await entry.save()
-                            giveaway_obj.entrants = entry.entrants
-                            log.debug(f"Loaded entrants for giveaway {msgid}: {entry.entrants}")
-                        else:
-                            log.warning(f"No database entry found for giveaway {msgid}, creating empty entry.")
-                            await GiveawayEntry(
-                                guild_id=giveaway["guildid"],
-                                message_id=int(msgid),
-                                entrants=[],
-                                created_at=datetime.now(timezone.utc),
-                            ).save()
+                        delivery = await self.draw_winner(giveaway, mark_ended=False, wait=False)
                     except Exception as exc:
-                        log.error(f"Error loading entrants for giveaway {msgid}: ", exc_info=exc)
-                        continue
-                    self.giveaways[int(msgid)] = giveaway_obj
-                    log.info(f"Successfully loaded giveaway {msgid}")
-                    view = GiveawayView(self)
-                    view.add_item(
-                        GiveawayButton(
-                            label=giveaway.get("kwargs", {}).get("button-text", "Join Giveaway"),
-                            style=giveaway.get("kwargs", {}).get("button-style", "green"),
-                            emoji=giveaway["emoji"],
-                            cog=self,
-                            id=giveaway["messageid"],
-                        )
-                    )
-                    self.bot.add_view(view)
-                except Exception as exc:
-                    log.error(f"Error loading giveaway {msgid}: ", exc_info=exc)
-                    continue
-        log.info(f"Loaded {len(self.giveaways)} active giveaways: {list(self.giveaways.keys())}")
-        while True:
-            try:
-                await self.check_giveaways()
-            except Exception as exc:
-                log.error("Exception in giveaway loop: ", exc_info=exc)
-            await asyncio.sleep(15)
+                        log.error(f"Error catching up on giveaway {giveaway.messageid}, retrying in a minute: ", exc_info=exc)
+                        self.giveaways[giveaway.messageid] = giveaway
+                        self.scheduler.schedule(giveaway.messageid, datetime.now(timezone.utc) + timedelta(minutes=1))
+                    else:
+                        # Marked one by one so an interrupted catch-up does not draw a giveaway twice.
+                        await self.mark_ended([giveaway])
+                    self.overdue.remove(giveaway)
+                # Waited on outside the lock, which only needs to cover the draw itself. Shielded so
+                # cancelling the catch-up on unload leaves the result to the delivery pipeline.
+                if delivery is not None:
+                    await asyncio.shield(delivery)
+                await asyncio.sleep(CATCH_UP_DELAY)
+
+        overdue = list(self.overdue)
+        await asyncio.gather(*(draw(giveaway) for giveaway in overdue))
+        log.info(f"Caught up on {len(overdue)} giveaways missed while offline.")
 
     async def cog_unload(self) -> None:
         log.info("Unloading giveaways cog...")
+        # Turn new clicks away first so nothing is queued on a pool that is shutting down.
+        self.router.closed = True
+        # Stop drawing before the delivery pipeline closes, or results submitted after it would never be sent.
+        tasks = [task for task in (self.giveaway_bgloop, self.catch_up_task, self.reaper) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.entry_pool.close()
+        await self.delivery.close()
         try:
-            for msgid, giveaway in self.giveaways.items():
-                try:
-                    await self.save_entrants(giveaway)
-                    giveaway_dict = deepcopy(giveaway.__dict__)
-                    giveaway_dict["endtime"] = giveaway_dict["endtime"].timestamp()
-                    giveaway_dict["kwargs"] = giveaway_dict.get("kwargs", {})
-                    await self.config.custom(GIVEAWAY_KEY, str(giveaway.guildid), str(msgid)).set(giveaway_dict)
-                    log.debug(f"Saved giveaway {msgid} to config and database.")
-                except Exception as exc:
-                    log.error(f"Failed to save giveaway {msgid} during unload: ", exc_info=exc)
+            await self.entrant_buffer.close()
         except Exception as exc:
-            log.error("Error during cog unload: ", exc_info=exc)
+            log.error("Failed to flush buffered entrants during unload: ", exc_info=exc)
+        start = time.perf_counter()
+        try:
+            await save_giveaways(self.giveaways.values())
+            log.debug(f"Saved {len(self.giveaways)} giveaways to the database.")
+        except Exception as exc:
+            log.error("Failed to save giveaways during unload: ", exc_info=exc)
+        # Giveaways still waiting to be caught up on are kept so they are drawn after the reload.
+        if self.loaded:
+            try:
+                rows = dump_giveaways([*self.giveaways.values(), *self.overdue])
+                size = await asyncio.to_thread(write_snapshot, rows)
+                log.info(
+                    f"Wrote a {size} byte snapshot of {len(rows)} giveaways in "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms."
+                )
+            except Exception as exc:
+                log.error("Failed to write the giveaway snapshot during unload: ", exc_info=exc)
         with contextlib.suppress(Exception):
             self.bot.remove_dev_env_value("giveaways")
-        self.giveaway_bgloop.cancel()
+        await self.integrations.close()
+        await self.label_refresher.close()
         log.debug(f"Active giveaways before unload: {list(self.giveaways.keys())}")
+        self.giveaways.clear()
         await self.session.close()
         log.info("Giveaways cog unloaded.")
 
     async def save_entrants(self, giveaway: Giveaway) -> None:
-        async with DB.transaction():
-            try:
-                existing = await GiveawayEntry.objects().get(
-                    GiveawayEntry.message_id == giveaway.messageid
-                )
-                if existing:
-                    existing.entrants = giveaway.entrants
-                    existing.updated_at = datetime.now(timezone.utc)
-                    if not isinstance(existing.created_at, datetime):
-                        log.warning(f"Invalid created_at for giveaway {giveaway.messageid}, resetting.")
-                        existing.created_at = datetime.now(timezone.utc)
-                    await existing.save()
-                    log.debug(f"Updated entrants for giveaway {giveaway.messageid}")
-                else:
-                    await GiveawayEntry(
-                        guild_id=giveaway.guildid,
-                        message_id=giveaway.messageid,
-                        entrants=giveaway.entrants,
-                        created_at=datetime.now(timezone.utc),
-                    ).save()
-                    log.debug(f"Created new database entry for giveaway {giveaway.messageid}")
-            except Exception as exc:
-                log.error(f"Error saving entrants for giveaway {giveaway.messageid}: ", exc_info=exc)
-                raise
-
-    async def check_giveaways(self) -> None:
-        log.debug(f"Checking giveaways: {list(self.giveaways.keys())}")
-        to_clear = []
-        giveaways = deepcopy(self.giveaways)
-        for msgid, giveaway in giveaways.items():
-            try:
-                if giveaway.endtime < datetime.now(timezone.utc):
-                    log.info(f"Giveaway {msgid} endtime {giveaway.endtime} is in the past, drawing winner.")
-                    await self.draw_winner(giveaway)
-                    to_clear.append(msgid)
-                    gw = await self.config.custom(GIVEAWAY_KEY, str(giveaway.guildid), str(msgid)).all()
-                    gw["ended"] = True
-                    await self.config.custom(GIVEAWAY_KEY, str(giveaway.guildid), str(msgid)).set(gw)
-            except Exception as exc:
-                log.error(f"Error checking giveaway {msgid}: ", exc_info=exc)
-        for message_id in to_clear:
-            if message_id in self.giveaways:
-                log.debug(f"Removing ended giveaway {message_id} from self.giveaways")
-                del self.giveaways[message_id]
-        await self.cleanup_ended_giveaways()
-
-    async def cleanup_ended_giveaways(self):
-        async with DB.transaction():
-            data = await self.config.custom(GIVEAWAY_KEY).all()
-            expired_ids = [
-                int(msgid)
-                for guild_id, giveaways in data.items()
-                for msgid, gw in giveaways.items()
-                if gw.get("ended", False)
-            ]
-            log.debug(f"Cleaning up expired giveaways: {expired_ids}")
-            if expired_ids:
+        """Write any buffered joins and leaves of a giveaway to the database."""
+        try:
+            await self.entrant_buffer.flush(giveaway.messageid)
+        except Exception as exc:
+            log.error(f"Error saving entrants for giveaway {giveaway.messageid}: ", exc_info=exc)
+            raise
+
+    async def check_giveaways(self, due: List[int]) -> None:
+        log.debug(f"Checking due giveaways: {due}")
+        now = datetime.now(timezone.utc)
+
+        async def end_due(msgid: int, giveaway: Giveaway) -> bool:
+            log.info(f"Giveaway {msgid} endtime {giveaway.endtime} is in the past, drawing winner.")
+            async with self.locks(msgid):
+                if msgid not in self.giveaways:
+                    return False
                 try:
-                    await GiveawayEntry.delete().where(GiveawayEntry.message_id.in_(expired_ids)).run()
-                    log.debug(f"Deleted {len(expired_ids)} expired giveaway entries from database")
+                    await self.draw_winner(giveaway, mark_ended=False, wait=False)
                 except Exception as exc:
-                    log.error("Error deleting expired giveaway entries: ", exc_info=exc)
-            for guild_id in data:
-                for msgid in expired_ids:
-                    if str(msgid) in data[str(guild_id)]:
-                        await self.config.custom(GIVEAWAY_KEY, guild_id, str(msgid)).clear()
-                        log.debug(f"Cleared config for expired giveaway {msgid} in guild {guild_id}")
-
-    async def draw_winner(self, giveaway: Giveaway):
+                    log.error(f"Error checking giveaway {msgid}, retrying in a minute: ", exc_info=exc)
+                    self.scheduler.schedule(msgid, now + timedelta(minutes=1))
+                    return False
+            if msgid in self.giveaways:
+                log.debug(f"Removing ended giveaway {msgid} from self.giveaways")
+                del self.giveaways[msgid]
+            return True
+
+        ready = []
+        for msgid in due:
+            giveaway = self.giveaways.get(msgid)
+            if giveaway is None:
+                continue
+            if giveaway.endtime > now:
+                self.scheduler.schedule(msgid, giveaway.endtime)
+                continue
+            ready.append((msgid, giveaway))
+        # Each draw waits for the entries in progress on its own giveaway, so they are not taken one after another.
+        drawn = await asyncio.gather(*(end_due(msgid, giveaway) for msgid, giveaway in ready))
+        ended = [giveaway for (_, giveaway), ok in zip(ready, drawn) if ok]
+        if ended:
+            await self.mark_ended(ended)
+
+    async def mark_ended(self, giveaways: Iterable[Giveaway]) -> None:
+        """Flag giveaways as ended in a single update, to be deleted once retention has passed."""
+        await mark_giveaways_ended((gw.messageid for gw in giveaways), time.time() + ENDED_RETENTION)
+
+    async def reap_ended(self, limit: int = REAP_BATCH_SIZE) -> int:
+        """Delete up to ``limit`` ended giveaways whose retention has passed, returning how many were reaped."""
+        reaped = await reap_ended_giveaways(time.time(), limit)
+        if reaped:
+            log.debug(f"Deleted {reaped} ended giveaways from the database")
+        return reaped
+
+    async def reap_loop(self) -> None:
+        while True:
+            delay = 300
+            try:
+                while await self.reap_ended():
+                    await asyncio.sleep(1)
+                due = await next_reap_time()
+                if due is not None:
+                    delay = min(delay, max(1, due - time.time()))
+            except Exception as exc:
+                log.error("Error cleaning up ended giveaways: ", exc_info=exc)
+            await asyncio.sleep(delay)
+
+    async def draw_winner(self, giveaway: Giveaway, *, mark_ended: bool = True, wait: bool = True):
+        """Draw the winners of a giveaway and send the result.
+
+        The result is sent through the delivery pipeline, with ``wait=False`` this
+        returns as soon as the winners are drawn. The delivery task is returned so
+        callers holding the giveaway's lock can release it before waiting on it.
+        """
         if not giveaway.messageid:
             log.error(f"Invalid message ID for giveaway: {giveaway.__dict__}")
             return
@@ -245,6 +428,7 @@ class Giveaways(commands.Cog):
         if channel_obj is None:
             log.warning(f"Channel {giveaway.channelid} not found for giveaway {giveaway.messageid}")
             return
+        await self.entrant_buffer.flush(giveaway.messageid)
 
         winners = giveaway.draw_winner()
         winner_objs = None
@@ -261,7 +445,10 @@ class Giveaways(commands.Cog):
                     txt += f"{winner_obj.mention} ({winner_obj.display_name})\n"
                     winner_objs.append(winner_obj)
 
+        # The delivery edit removes the view, a pending count update would only race it.
+        self.label_refresher.discard(giveaway.messageid)
         msg = channel_obj.get_partial_message(giveaway.messageid)
+        prefix = (await self.bot.get_prefix(msg))[-1]
         winners_count = giveaway.kwargs.get("winners", 1) or 1
         embed = discord.Embed(
             title=f"{f'{winners_count}x ' if winners_count > 1 else ''}{giveaway.prize}",
@@ -269,55 +456,50 @@ class Giveaways(commands.Cog):
             color=discord.Color.blue(),
             timestamp=datetime.now(timezone.utc),
         )
-        embed.set_footer(
-            text=f"Reroll: {(await self.bot.get_prefix(msg))[-1]}gw reroll {giveaway.messageid} | Ended at"
-        )
-        try:
-            await msg.edit(content="🎉 Giveaway Ended 🎉", embed=embed, view=None)
-        except (discord.NotFound, discord.Forbidden) as exc:
-            log.error(f"Error editing giveaway message {giveaway.messageid}: ", exc_info=exc)
-            if giveaway.messageid in self.giveaways:
-                del self.giveaways[giveaway.messageid]
-            gw = await self.config.custom(
-                GIVEAWAY_KEY, str(giveaway.guildid), str(giveaway.messageid)
-            ).all()
-            gw["ended"] = True
-            await self.config.custom(GIVEAWAY_KEY, str(giveaway.guildid), str(giveaway.messageid)).set(gw)
-            return
+        embed.set_footer(text=f"Reroll: {prefix}gw reroll {giveaway.messageid} | Ended at")
 
+        announce = None
         if giveaway.kwargs.get("announce"):
             announce_embed = discord.Embed(
                 title="Giveaway Ended",
                 description=f"Congratulations to the {f'{str(winners_count)} ' if winners_count > 1 else ''}winner{'s' if winners_count > 1 else ''} of [{giveaway.prize}]({msg.jump_url}).\n{txt}",
                 color=discord.Color.blue(),
             )
-            announce_embed.set_footer(
-                text=f"Reroll: {(await self.bot.get_prefix(msg))[-1]}gw reroll {giveaway.messageid}"
+            announce_embed.set_footer(text=f"Reroll: {prefix}gw reroll {giveaway.messageid}")
+            content = (
+                "Congratulations " + ",".join([x.mention for x in winner_objs])
+                if winner_objs is not None
+                else ""
             )
-            await channel_obj.send(
-                content=(
-                    "Congratulations " + ",".join([x.mention for x in winner_objs])
-                    if winner_objs is not None
-                    else ""
-                ),
-                embed=announce_embed,
-            )
-        if winner_objs is not None:
-            if giveaway.kwargs.get("congratulate", False):
-                for winner in winner_objs:
-                    with contextlib.suppress(discord.Forbidden):
-                        await winner.send(
-                            f"Congratulations! You won {giveaway.prize} in the giveaway on {guild}!"
-                        )
+            announce = lambda: channel_obj.send(content=content, embed=announce_embed)
+        dms = []
+        if winner_objs is not None and giveaway.kwargs.get("congratulate", False):
+            text = f"Congratulations! You won {giveaway.prize} in the giveaway on {guild}!"
+            dms = [(winner, text) for winner in winner_objs]
+        delivery = self.delivery.submit(
+            giveaway.messageid,
+            edit=lambda: msg.edit(content="🎉 Giveaway Ended 🎉", embed=embed, view=None),
+            announce=announce,
+            dms=dms,
+        )
+
         if giveaway.messageid in self.giveaways:
             log.debug(f"Removing giveaway {giveaway.messageid} from self.giveaways")
             del self.giveaways[giveaway.messageid]
-        gw = await self.config.custom(
-            GIVEAWAY_KEY, str(giveaway.guildid), str(giveaway.messageid)
-        ).all()
-        gw["ended"] = True
-        await self.config.custom(GIVEAWAY_KEY, str(giveaway.guildid), str(giveaway.messageid)).set(gw)
+        self.scheduler.cancel(giveaway.messageid)
+        if mark_ended:
+            await self.mark_ended([giveaway])
+        if wait:
+            await delivery
         log.info(f"Giveaway {giveaway.messageid} ended successfully in guild {guild.id} with prize '{giveaway.prize}'")
+        return delivery
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        try:
+            await self.router.dispatch(interaction)
+        except Exception as exc:
+            log.error("Error handling giveaway button click: ", exc_info=exc)
 
     @commands.hybrid_group(aliases=["gw"])
     @commands.bot_has_permissions(add_reactions=True, embed_links=True)
@@ -354,21 +536,7 @@ class Giveaways(commands.Cog):
             description=f"\nClick the button below to enter the giveaway\n\n**Hosted by:** {ctx.author.mention}\n\nEnds: <t:{int(end.timestamp())}:R>",
             color=discord.Color.blue(),
         )
-        view = GiveawayView(self)
         msg = await channel.send(embed=embed)
-        view.add_item(
-            GiveawayButton(
-                label="Join Giveaway",
-                style="green",
-                emoji="🎉",
-                cog=self,
-                id=msg.id,
-            )
-        )
-        self.bot.add_view(view)
-        await msg.edit(view=view)
-        if ctx.interaction:
-            await ctx.send("Giveaway created!", ephemeral=True)
         giveaway_obj = Giveaway(
             ctx.guild.id,
             channel.id,
@@ -378,11 +546,12 @@ class Giveaways(commands.Cog):
             "🎉",
             winners=1,
         )
+        await msg.edit(view=build_view(giveaway_obj))
+        if ctx.interaction:
+            await ctx.send("Giveaway created!", ephemeral=True)
         self.giveaways[msg.id] = giveaway_obj
-        giveaway_dict = deepcopy(giveaway_obj.__dict__)
-        giveaway_dict["endtime"] = giveaway_dict["endtime"].timestamp()
-        await self.config.custom(GIVEAWAY_KEY, str(ctx.guild.id), str(msg.id)).set(giveaway_dict)
-        await self.save_entrants(giveaway_obj)
+        self.scheduler.schedule(msg.id, end)
+        await save_giveaways([giveaway_obj])
         log.info(f"Started giveaway {msg.id} in guild {ctx.guild.id} with prize '{prize}'")
 
     @giveaway.command()
@@ -390,65 +559,47 @@ class Giveaways(commands.Cog):
     @app_commands.describe(msgid="The message ID of the giveaway to reroll.")
     async def reroll(self, ctx: commands.Context, msgid: int):
         """Reroll a giveaway."""
-        if msgid not in self.locks:
-            self.locks[msgid] = Lock()
-        async with self.locks[msgid]:
-            data = await self.config.custom(GIVEAWAY_KEY, str(ctx.guild.id)).all()
-            if str(msgid) not in data:
+        async with self.locks(msgid):
+            await self.entrant_buffer.flush(msgid)
+            giveaway = await load_giveaway(msgid)
+            if giveaway is None or giveaway.guildid != ctx.guild.id:
                 return await ctx.send("Giveaway not found.")
             if msgid in self.giveaways:
                 return await ctx.send(
                     f"Giveaway already running. Please wait for it to end or end it via `{ctx.clean_prefix}gw end {msgid}`."
                 )
-            giveaway_dict = data[str(msgid)]
-            try:
-                giveaway_dict["endtime"] = datetime.fromtimestamp(giveaway_dict["endtime"], tz=timezone.utc)
-            except (TypeError, ValueError) as exc:
-                log.error(f"Invalid endtime for reroll of giveaway {msgid}: {exc}")
-                return await ctx.send("Invalid giveaway endtime. Check logs for details.")
-            if not all(key in giveaway_dict for key in ["guildid", "channelid", "messageid", "prize", "emoji"]):
-                log.error(f"Giveaway {msgid} missing required keys for reroll: {giveaway_dict}")
-                return await ctx.send("Invalid giveaway data. Check logs for details.")
-            giveaway = Giveaway(**giveaway_dict)
             try:
-                entry = await GiveawayEntry.objects().get(GiveawayEntry.message_id == msgid)
-                if entry:
-                    if not isinstance(entry.created_at, datetime):
-                        log.warning(f"Invalid created_at for giveaway {msgid}, resetting.")
-                        entry.created_at = datetime.now(timezone.utc)
-                        await entry.save()
-                    giveaway.entrants = entry.entrants
+                giveaway.entrants = await load_entrants(msgid)
             except Exception as exc:
                 log.error(f"Error loading entrants for reroll of giveaway {msgid}: ", exc_info=exc)
             try:
-                await self.draw_winner(giveaway)
+                delivery = await self.draw_winner(giveaway, mark_ended=False, wait=False)
             except GiveawayExecError as e:
-                await ctx.send(e.message)
-            else:
-                await ctx.tick()
-            log.info(f"Rerolled giveaway {msgid} in guild {ctx.guild.id}")
+                return await ctx.send(e.message)
+        if delivery is not None:
+            await delivery
+        await ctx.tick()
+        log.info(f"Rerolled giveaway {msgid} in guild {ctx.guild.id}")
 
     @giveaway.command()
     @commands.has_permissions(manage_guild=True)
     @app_commands.describe(msgid="The message ID of the giveaway to end.")
     async def end(self, ctx: commands.Context, msgid: int):
         """End a giveaway."""
-        if msgid in self.giveaways:
-            if self.giveaways[msgid].guildid != ctx.guild.id:
+        async with self.locks(msgid):
+            giveaway = self.giveaways.in_guild(ctx.guild.id, msgid)
+            if giveaway is None:
                 return await ctx.send("Giveaway not found.")
             try:
-                await self.draw_winner(self.giveaways[msgid])
-                #del self.giveaways[msgid]
-                gw = await self.config.custom(GIVEAWAY_KEY, str(ctx.guild.id), str(msgid)).all()
-                gw["ended"] = True
-                await self.config.custom(GIVEAWAY_KEY, str(ctx.guild.id), str(msgid)).set(gw)
-                await ctx.tick()
-                log.info(f"Manually ended giveaway {msgid} in guild {ctx.guild.id}")
+                delivery = await self.draw_winner(giveaway, wait=False)
             except Exception as exc:
                 log.error(f"Error ending giveaway {msgid}: ", exc_info=exc)
-                await ctx.send("Error ending giveaway. Check logs for details.")
-        else:
-            await ctx.send("Giveaway not found.")
+                return await ctx.send("Error ending giveaway. Check logs for details.")
+        # The result is sent after the lock is released so queued entries are not held up by it.
+        if delivery is not None:
+            await delivery
+        await ctx.tick()
+        log.info(f"Manually ended giveaway {msgid} in guild {ctx.guild.id}")
 
     @giveaway.command(aliases=["adv"])
     @commands.has_permissions(manage_guild=True)
@@ -470,7 +621,7 @@ class Giveaways(commands.Cog):
             description += "\n\n**Requirements:**\n" + self.generate_settings_text(ctx, arguments)
         emoji = arguments["emoji"] or "🎉"
         if isinstance(emoji, int):
-            emoji = self.bot.get_emoji(emoji)
+            emoji = self.bot.get_emoji(emoji) or "🎉"
         hosted_by = ctx.guild.get_member(arguments.get("hosted-by", ctx.author.id)) or ctx.author
         embed = discord.Embed(
             title=f"{f'{winners}x ' if winners > 1 else ''}{prize}",
@@ -491,7 +642,6 @@ class Giveaways(commands.Cog):
                 role = ctx.guild.get_role(mention)
                 if role is not None:
                     txt += f"{role.mention} "
-        view = GiveawayView(self)
         msg = await channel.send(
             content=f"🎉 Giveaway 🎉{txt}",
             embed=embed,
@@ -500,20 +650,6 @@ class Giveaways(commands.Cog):
                 everyone=bool(arguments["ateveryone"]),
             ),
         )
-        view.add_item(
-            GiveawayButton(
-                label=arguments["button-text"] or "Join Giveaway",
-                style=arguments["button-style"] or "green",
-                emoji=emoji,
-                cog=self,
-                update=arguments.get("update_button", False),
-                id=msg.id,
-            )
-        )
-        self.bot.add_view(view)
-        await msg.edit(view=view)
-        if ctx.interaction:
-            await ctx.send("Giveaway created!", ephemeral=True)
         giveaway_obj = Giveaway(
             ctx.guild.id,
             channel.id,
@@ -527,12 +663,14 @@ class Giveaways(commands.Cog):
                 if k not in ["prize", "duration", "channel", "emoji"]
             },
         )
+        await msg.edit(view=build_view(giveaway_obj))
+        if ctx.interaction:
+            await ctx.send("Giveaway created!", ephemeral=True)
         self.giveaways[msg.id] = giveaway_obj
-        giveaway_dict = deepcopy(giveaway_obj.__dict__)
-        giveaway_dict["endtime"] = giveaway_dict["endtime"].timestamp()
-        del giveaway_dict["kwargs"]["colour"]
-        await self.config.custom(GIVEAWAY_KEY, str(ctx.guild.id), str(msg.id)).set(giveaway_dict)
-        await self.save_entrants(giveaway_obj)
+        self.scheduler.schedule(msg.id, end)
+        if arguments["mee6_level"] is not None:
+            self.integrations.mee6.warm(ctx.guild.id)
+        await save_giveaways([giveaway_obj])
         log.info(f"Started advanced giveaway {msg.id} in guild {ctx.guild.id} with prize '{prize}'")
 
     @giveaway.command()
@@ -540,44 +678,24 @@ class Giveaways(commands.Cog):
     @app_commands.describe(msgid="The message ID of the giveaway to list entrants for.")
     async def entrants(self, ctx: commands.Context, msgid: int):
         """List all entrants for a giveaway."""
-        if msgid not in self.giveaways:
+        giveaway = self.giveaways.in_guild(ctx.guild.id, msgid)
+        if giveaway is None:
             return await ctx.send("Giveaway not found.")
-        giveaway = self.giveaways[msgid]
         if not giveaway.entrants:
             return await ctx.send("No entrants.")
-        count = {}
-        for entrant in giveaway.entrants:
-            if entrant not in count:
-                count[entrant] = 1
-            else:
-                count[entrant] += 1
-        msg = ""
-        for userid, count_int in count.items():
-            user = ctx.guild.get_member(userid)
-            msg += f"{user.mention} ({count_int})\n" if user else f"<{userid}> ({count_int})\n"
-        embeds = []
-        for page in pagify(msg, delims=["\n"], page_length=800):
-            embed = discord.Embed(
-                title="Entrants",
-                description=page,
-                color=discord.Color.blue(),
-            )
-            embed.set_footer(text=f"Total entrants: {len(count)}")
-            embeds.append(embed)
-        if len(embeds) == 1:
-            return await ctx.send(embed=embeds[0])
-        return await menu(ctx, embeds, DEFAULT_CONTROLS)
+        await EntrantsMenu(ctx, giveaway.entrants).start()
 
     @giveaway.command()
     @commands.has_permissions(manage_guild=True)
     @app_commands.describe(msgid="The message ID of the giveaway to get info for.")
     async def info(self, ctx: commands.Context, msgid: int):
         """Information about a giveaway."""
-        if msgid not in self.giveaways:
+        giveaway = self.giveaways.in_guild(ctx.guild.id, msgid)
+        if giveaway is None:
             return await ctx.send("Giveaway not found.")
-        giveaway = self.giveaways[msgid]
+        await self.save_entrants(giveaway)
         winners = giveaway.kwargs.get("winners", 1) or 1
-        msg = f"**Entrants:** {len(giveaway.entrants)}\n**End**: <t:{int(giveaway.endtime.timestamp())}:R>\n"
+        msg = f"**Entrants:** {await count_entrants(msgid)}\n**End**: <t:{int(giveaway.endtime.timestamp())}:R>\n"
         for kwarg in giveaway.kwargs:
             if giveaway.kwargs[kwarg]:
                 msg += f"**{kwarg.title()}:** {giveaway.kwargs[kwarg]}\n"
@@ -592,19 +710,14 @@ class Giveaways(commands.Cog):
     @giveaway.command(name="list")
     @commands.has_permissions(manage_guild=True)
     async def _list(self, ctx: commands.Context):
-        """List all giveaways in the server."""
-        if not self.giveaways:
-            return await ctx.send("No giveaways are running.")
-        giveaways = {
-            x: self.giveaways[x]
-            for x in self.giveaways
-            if self.giveaways[x].guildid == ctx.guild.id
-        }
+        """List all giveaways in the server, soonest ending first."""
+        giveaways = self.giveaways.for_guild(ctx.guild.id)
         if not giveaways:
             return await ctx.send("No giveaways are running.")
         msg = "".join(
-            f"{msgid}: [{giveaways[msgid].prize}](https://discord.com/channels/{value.guildid}/{giveaways[msgid].channelid}/{msgid})\n"
-            for msgid, value in giveaways.items()
+            f"{gw.messageid}: [{gw.prize}](https://discord.com/channels/{gw.guildid}/{gw.channelid}/{gw.messageid}) "
+            f"ends <t:{int(gw.endtime.timestamp())}:R>\n"
+            for gw in giveaways
         )
         embeds = []
         for page in pagify(msg, delims=["\n"]):
@@ -624,7 +737,6 @@ class Giveaways(commands.Cog):
         """Explanation of giveaway advanced and the arguments it supports."""
         msg = """
         Giveaway advanced creation.
-        NOTE: Giveaways are checked every 15 seconds, this means that the giveaway may end up being slightly longer than the specified duration.
 
         Giveaway advanced contains many different flags that can be used to customize the giveaway.
         The flags are as follows:
@@ -689,27 +801,24 @@ class Giveaways(commands.Cog):
 
         See `[p]gw explain` for more info on the flags.
         """
-        if msgid not in self.giveaways:
-            return await ctx.send("Giveaway not found.")
-        giveaway = self.giveaways[msgid]
-        if giveaway.guildid != ctx.guild.id:
-            return await ctx.send("Giveaway not found.")
-        for flag in flags:
-            if flags[flag]:
-                if flag in ["prize", "duration", "channel", "emoji"]:
-                    setattr(giveaway, flag, flags[flag])
-                elif flag in ["roles", "multi_roles", "blacklist", "mentions"]:
-                    giveaway.kwargs[flag] = [x.id for x in flags[flag]]
-                else:
-                    giveaway.kwargs[flag] = flags[flag]
-        giveaway.endtime = datetime.now(timezone.utc) + giveaway.duration
-        self.giveaways[msgid] = giveaway
-        giveaway_dict = deepcopy(giveaway.__dict__)
-        giveaway_dict["endtime"] = giveaway_dict["endtime"].timestamp()
-        giveaway_dict["duration"] = giveaway_dict["duration"].total_seconds()
-        del giveaway_dict["kwargs"]["colour"]
-        await self.config.custom(GIVEAWAY_KEY, str(ctx.guild.id), str(msgid)).set(giveaway_dict)
-        await self.save_entrants(giveaway)
+        async with self.locks(msgid):
+            giveaway = self.giveaways.in_guild(ctx.guild.id, msgid)
+            if giveaway is None:
+                return await ctx.send("Giveaway not found.")
+            for flag in flags:
+                if flags[flag]:
+                    if flag in ["prize", "duration", "channel", "emoji"]:
+                        setattr(giveaway, flag, flags[flag])
+                    elif flag in ["roles", "multi_roles", "blacklist", "mentions"]:
+                        giveaway.kwargs[flag] = [x.id for x in flags[flag]]
+                    else:
+                        giveaway.kwargs[flag] = flags[flag]
+            giveaway.compile_requirements()
+            giveaway.endtime = datetime.now(timezone.utc) + giveaway.duration
+            self.giveaways[msgid] = giveaway
+            self.scheduler.schedule(msgid, giveaway.endtime)
+            await save_giveaways([giveaway])
+            await self.save_entrants(giveaway)
         message = ctx.guild.get_channel(giveaway.channelid).get_partial_message(giveaway.messageid)
         hosted_by = (
             ctx.guild.get_member(giveaway.kwargs.get("hosted_id", ctx.author.id)) or ctx.author
@@ -723,12 +832,185 @@ class Giveaways(commands.Cog):
         await ctx.tick()
         log.info(f"Edited giveaway {msgid} in guild {ctx.guild.id}")
 
+    @giveaway.command()
+    @commands.is_owner()
+    async def durability(
+        self, ctx: commands.Context, seconds: float, changes: Optional[int] = None
+    ):
+        """Set how long entries may stay buffered before being written to the database.
+
+        Buffered entries are written every `seconds`, or sooner once `changes` entries are pending.
+        Entries made within this window can be lost if the bot crashes.
+        """
+        if seconds < 0.1 or seconds > 60:
+            return await ctx.send("The interval must be between 0.1 and 60 seconds.")
+        if changes is not None and changes < 1:
+            return await ctx.send("The change threshold must be greater than 0.")
+        await self.config.flush_interval.set(seconds)
+        self.entrant_buffer.interval = seconds
+        if changes is not None:
+            await self.config.flush_threshold.set(changes)
+            self.entrant_buffer.max_pending = changes
+        await ctx.send(
+            f"Entrants will be written every {seconds} seconds or after {self.entrant_buffer.max_pending} changes."
+        )
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def engine(self, ctx: commands.Context, profile: str, samples: int = 50):
+        """Choose the database profile, `default` or `tuned`, and benchmark it.
+
+        The tuned profile uses WAL journaling, `synchronous=NORMAL`, a larger page cache,
+        memory-mapped I/O and a busy timeout. The write latency of both profiles is
+        measured with `samples` single-entrant commits.
+        """
+        profile = profile.lower()
+        if profile not in ("default", "tuned"):
+            return await ctx.send("The profile must be `default` or `tuned`.")
+        if samples < 1 or samples > 1000:
+            return await ctx.send("The number of samples must be between 1 and 1000.")
+        async with ctx.typing():
+            await self.entrant_buffer.flush()
+            results = {}
+            for candidate in ("default", "tuned", profile):
+                journal_mode = await apply_engine_profile(candidate)
+                if candidate not in results:
+                    latencies = sorted(await benchmark_writes(samples))
+                    results[candidate] = (
+                        journal_mode,
+                        latencies[len(latencies) // 2],
+                        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                    )
+        await self.config.engine_profile.set(profile)
+        msg = "\n".join(
+            f"{name} ({mode}): p50 {p50 * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms"
+            for name, (mode, p50, p99) in results.items()
+        )
+        await ctx.send(f"{box(msg)}Now using the {profile} profile.")
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def entry_pool(self, ctx: commands.Context, workers: int, queue: int = 1000):
+        """Set how many entries are processed at once and how many may wait.
+
+        Clicks arriving while `queue` entries are already waiting are turned away with a busy message.
+        """
+        if workers < 1 or workers > 100:
+            return await ctx.send("The number of workers must be between 1 and 100.")
+        if queue < 1 or queue > 100000:
+            return await ctx.send("The queue size must be between 1 and 100000.")
+        await self.config.entry_workers.set(workers)
+        await self.config.entry_queue.set(queue)
+        self.entry_pool.resize(workers, queue)
+        await ctx.send(f"Entries are now processed by {workers} workers with up to {queue} waiting.")
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def entry_stats(self, ctx: commands.Context):
+        """Show queue depth and wait times of entry processing, and how long requirement checks take."""
+        pool = self.entry_pool
+        msg = (
+            f"**Workers:** {pool.workers}\n"
+            f"**Queue:** {pool.depth}/{pool.max_queue} waiting, peak {pool.peak_depth}\n"
+            f"**Processed:** {pool.processed}, **turned away:** {pool.rejected}\n"
+            f"**Wait:** {pool.average_wait * 1000:.0f}ms average, {pool.max_wait * 1000:.0f}ms max\n"
+        )
+        for name, (runs, total, worst, timeouts) in self.integrations.timings.items():
+            msg += (
+                f"**{name}:** {runs} checks, {total / runs * 1000:.0f}ms average, "
+                f"{worst * 1000:.0f}ms max, {timeouts} timed out\n"
+            )
+        embed = discord.Embed(title="Giveaway Entries", description=msg, color=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def check_timeout(self, ctx: commands.Context, per_check: float, overall: float):
+        """Set how long requirement checks against other bots may take.
+
+        Each check is given `per_check` seconds and all checks of one entry run together within `overall` seconds.
+        """
+        if per_check <= 0 or overall <= 0 or overall > 60:
+            return await ctx.send("The timeouts must be positive and the overall deadline at most 60 seconds.")
+        if per_check > overall:
+            return await ctx.send("A single check cannot be given longer than the overall deadline.")
+        await self.config.check_timeout.set(per_check)
+        await self.config.entry_deadline.set(overall)
+        self.integrations.check_timeout = per_check
+        self.integrations.entry_deadline = overall
+        await ctx.send(f"Requirement checks now time out after {per_check}s each and {overall}s overall.")
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def label_interval(self, ctx: commands.Context, seconds: float):
+        """Set how often `--update-button` giveaways may have their entrant count refreshed."""
+        if seconds < 1 or seconds > 300:
+            return await ctx.send("The interval must be between 1 and 300 seconds.")
+        await self.config.label_interval.set(seconds)
+        self.label_refresher.interval = seconds
+        await ctx.send(f"Button labels will be refreshed at most every {seconds} seconds.")
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def cache_stats(self, ctx: commands.Context):
+        """Show hit and miss counters of the integration lookup caches.
+
+        Collapsed requests are cache misses that waited on an identical request already in flight.
+        """
+        msg = ""
+        for provider, cache in self.integrations.caches.items():
+            total = cache.hits + cache.misses
+            ratio = f"{cache.hits / total:.0%}" if total else "n/a"
+            flight = self.integrations.flights[provider]
+            msg += (
+                f"**{provider}:** {cache.hits} hits, {cache.misses} misses ({ratio}), "
+                f"{len(cache)}/{cache.maxsize} entries, TTL {cache.ttl}s\n"
+                f"{flight.calls} requests, {flight.collapsed} collapsed\n"
+            )
+        mee6 = self.integrations.mee6
+        msg += (
+            f"**mee6:** {mee6.hits} hits, {mee6.misses} misses, {len(mee6)} guild snapshots, "
+            f"refreshed every {mee6.interval}s\n"
+            f"{mee6.flight.calls} requests, {mee6.flight.collapsed} collapsed\n"
+        )
+        http = self.integrations.http
+        for provider, breaker in http.breakers.items():
+            msg += (
+                f"**{provider} API:** {http.requests[provider]} requests, {http.throttled[provider]} rate limited, "
+                f"{http.rejected[provider]} refused, circuit {breaker.state}\n"
+            )
+        embed = discord.Embed(title="Integration Caches", description=msg, color=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+    @giveaway.command()
+    @commands.is_owner()
+    async def cache_ttl(self, ctx: commands.Context, provider: str, seconds: int):
+        """Set how long lookups of an integration are cached.
+
+        Providers are `mee6`, `tatsu`, `amari` and `leveler`. Use 0 to disable caching.
+        For `mee6` this is how often leaderboard snapshots are refreshed, at least 60 seconds.
+        """
+        provider = provider.lower()
+        if provider not in DEFAULT_CACHE_TTLS:
+            return await ctx.send(f"Provider must be one of: {', '.join(DEFAULT_CACHE_TTLS)}")
+        if seconds < 0:
+            return await ctx.send("The TTL cannot be negative.")
+        if provider == "mee6" and seconds < 60:
+            return await ctx.send("MEE6 leaderboards cannot be refreshed more often than every 60 seconds.")
+        async with self.config.cache_ttls() as ttls:
+            ttls[provider] = seconds
+        self.integrations.set_ttls({provider: seconds})
+        if provider in self.integrations.caches:
+            self.integrations.caches[provider].clear()
+        await ctx.send(f"{provider} lookups are now cached for {seconds} seconds.")
+
     @giveaway.command()
     @commands.is_owner()
     async def debug_config(self, ctx: commands.Context):
         """Dump giveaway config data."""
         data = await self.config.custom(GIVEAWAY_KEY).all()
-        await ctx.send(f"Config: {data}")
+        active = await load_active_giveaways()
+        await ctx.send(f"Config: {data}\nActive giveaways in the database: {len(active)}")
 
     def generate_settings_text(self, ctx: commands.Context, arguments: Args) -> str:
         """Generate text describing giveaway requirements."""
@@ -0,0 +1,98 @@
+import asyncio
+from logging import getLogger
+from typing import Any, Dict, NamedTuple, Optional
+
+import aiohttp
+
+from .objects import ProviderUnavailableError
+from .ratelimit import CircuitBreaker, TokenBucket
+
+log = getLogger("red.flare.giveaways")
+
+
+class ProviderPolicy(NamedTuple):
+    rate: float  # requests per second
+    burst: int
+    concurrency: int
+
+
+# Tatsu and Amari allow 60 requests a minute per token, MEE6 has no published quota.
+PROVIDER_POLICIES = {
+    "tatsu": ProviderPolicy(rate=1.0, burst=10, concurrency=4),
+    "amari": ProviderPolicy(rate=1.0, burst=10, concurrency=4),
+    "mee6": ProviderPolicy(rate=1.0, burst=5, concurrency=2),
+}
+PROVIDER_NAMES = {"tatsu": "Tatsu", "amari": "Amari", "mee6": "MEE6"}
+
+MAX_RETRIES = 2
+MAX_RETRY_AFTER = 30.0
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Session shared by every provider, with bounded connections and timeouts."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(total=10, connect=3),
+    )
+
+
+class ProviderHttp:
+    """Rate limited, circuit broken GET requests to the third party APIs.
+
+    Every provider has a token bucket matching its quota, a cap on concurrent
+    requests and a circuit breaker. A 429 pauses the provider's bucket for the
+    ``Retry-After`` the response asked for before retrying.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, policies: Dict[str, ProviderPolicy] = PROVIDER_POLICIES) -> None:
+        self.session = session
+        self.buckets = {name: TokenBucket(p.rate, p.burst) for name, p in policies.items()}
+        self.semaphores = {name: asyncio.Semaphore(p.concurrency) for name, p in policies.items()}
+        self.breakers = {name: CircuitBreaker() for name in policies}
+        self.requests = dict.fromkeys(policies, 0)
+        self.throttled = dict.fromkeys(policies, 0)
+        self.rejected = dict.fromkeys(policies, 0)
+
+    async def get_json(self, provider: str, url: str, **kwargs) -> Optional[Any]:
+        """GET ``url`` and return its JSON body, or None if the provider had no data."""
+        breaker = self.breakers[provider]
+        for attempt in range(MAX_RETRIES + 1):
+            if not breaker.allow():
+                self.rejected[provider] += 1
+                raise ProviderUnavailableError(
+                    f"The {PROVIDER_NAMES.get(provider, provider)} API is currently unavailable, please try again later."
+                )
+            await self.buckets[provider].acquire()
+            async with self.semaphores[provider]:
+                self.requests[provider] += 1
+                try:
+                    async with self.session.get(url, **kwargs) as r:
+                        if r.status == 429:
+                            retry_after = _retry_after(r.headers)
+                            self.throttled[provider] += 1
+                            self.buckets[provider].pause(retry_after)
+                            log.debug(f"{provider} rate limited us for {retry_after}s")
+                            if attempt < MAX_RETRIES and retry_after <= MAX_RETRY_AFTER:
+                                continue
+                            breaker.record_failure()
+                            return None
+                        if r.status >= 500:
+                            breaker.record_failure()
+                            return None
+                        breaker.record_success()
+                        if r.status != 200:
+                            return None
+                        return await r.json()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    breaker.record_failure()
+                    raise
+        return None
+
+
+def _retry_after(headers, default: float = 1.0) -> float:
+    for header in ("Retry-After", "X-RateLimit-Reset-After"):
+        try:
+            return max(0.0, float(headers[header]))
+        except (KeyError, ValueError):
+            continue
+    return default
@@ -0,0 +1,244 @@
+import asyncio
+import contextlib
+import time
+from logging import getLogger
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+import aiohttp
+
+from .cache import SingleFlight, TTLCache
+from .http_client import ProviderHttp
+from .objects import GiveawayExecError, ProviderUnavailableError
+
+log = getLogger("red.flare.giveaways")
+
+# The mee6 entry is the refresh interval of the leaderboard snapshots.
+DEFAULT_CACHE_TTLS = {"mee6": 300, "tatsu": 60, "amari": 60, "leveler": 30}
+CACHE_SIZES = {"tatsu": 10000, "amari": 10000, "leveler": 10000}
+
+MEE6_LEADERBOARD_URL = "https://mee6.xyz/api/plugins/leaderboard/leaderboard"
+MEE6_PAGE_SIZE = 1000
+MEE6_MAX_PAGES = 100
+
+# Seconds a single requirement check, and all checks of one entry together, may take.
+DEFAULT_CHECK_TIMEOUT = 5.0
+DEFAULT_ENTRY_DEADLINE = 8.0
+
+
+class CheckTimings:
+    """Running count, total and worst duration of each requirement check."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, list] = {}
+
+    def record(self, name: str, seconds: float, *, timed_out: bool = False) -> None:
+        # [runs, total seconds, max seconds, timeouts]
+        stat = self.stats.setdefault(name, [0, 0.0, 0.0, 0])
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] = max(stat[2], seconds)
+        stat[3] += timed_out
+
+    def items(self):
+        return self.stats.items()
+
+
+class Mee6Leaderboards:
+    """Per-guild snapshots of the MEE6 leaderboard, indexed by user id.
+
+    A guild's leaderboard is fetched in full on first use and then refreshed in
+    the background every ``interval`` seconds while it keeps being used, so entry
+    checks normally answer from memory. A failed refresh keeps the old snapshot.
+    """
+
+    def __init__(
+        self,
+        http: ProviderHttp,
+        *,
+        interval: float = DEFAULT_CACHE_TTLS["mee6"],
+        idle_after: float = 6 * 3600,
+        base_url: str = MEE6_LEADERBOARD_URL,
+    ) -> None:
+        self.http = http
+        self.interval = interval
+        self.idle_after = idle_after
+        self.base_url = base_url
+        self.hits = 0
+        self.misses = 0
+        self.flight = SingleFlight()
+        self._levels: Dict[int, Dict[int, int]] = {}
+        self._last_used: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    def warm(self, guild_id: int) -> None:
+        """Start tracking a guild and fetch its leaderboard ahead of the first entry."""
+        self._last_used[guild_id] = time.monotonic()
+        if guild_id not in self._levels:
+            asyncio.ensure_future(self._refresh_once(guild_id))
+
+    async def level(self, guild_id: int, user_id: int) -> Optional[int]:
+        """Return the MEE6 level of a member, or None if the leaderboard is unavailable."""
+        self._last_used[guild_id] = time.monotonic()
+        levels = self._levels.get(guild_id)
+        if levels is None:
+            self.misses += 1
+            levels = await self._refresh_once(guild_id)
+            if levels is None:
+                return None
+        else:
+            self.hits += 1
+        return levels.get(user_id, 0)
+
+    async def _refresh_once(self, guild_id: int) -> Optional[Dict[int, int]]:
+        return await self.flight.do(guild_id, lambda: self._refresh(guild_id))
+
+    async def _refresh(self, guild_id: int) -> Optional[Dict[int, int]]:
+        try:
+            levels = await get_mee6_levels(self.http, guild_id, self.base_url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ProviderUnavailableError) as exc:
+            log.warning(f"Failed to fetch the MEE6 leaderboard of guild {guild_id}: {exc}")
+            levels = None
+        if levels is not None:
+            self._levels[guild_id] = levels
+        return levels
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            cutoff = time.monotonic() - self.idle_after
+            for guild_id, last_used in list(self._last_used.items()):
+                if last_used < cutoff:
+                    del self._last_used[guild_id]
+                    self._levels.pop(guild_id, None)
+                    continue
+                try:
+                    await self._refresh_once(guild_id)
+                except Exception as exc:
+                    log.error(f"Error refreshing MEE6 leaderboard of guild {guild_id}: ", exc_info=exc)
+
+
+class Integrations:
+    """Third party lookups used by giveaway requirements.
+
+    Results are cached per provider, and concurrent misses for the same key
+    share a single request.
+    """
+
+    def __init__(self, bot, session) -> None:
+        self.bot = bot
+        self.http = ProviderHttp(session)
+        self.caches: Dict[str, TTLCache] = {
+            provider: TTLCache(maxsize=CACHE_SIZES[provider], ttl=ttl)
+            for provider, ttl in DEFAULT_CACHE_TTLS.items()
+            if provider in CACHE_SIZES
+        }
+        self.flights: Dict[str, SingleFlight] = {
+            provider: SingleFlight() for provider in CACHE_SIZES
+        }
+        self.mee6 = Mee6Leaderboards(self.http)
+        self.check_timeout = DEFAULT_CHECK_TIMEOUT
+        self.entry_deadline = DEFAULT_ENTRY_DEADLINE
+        self.timings = CheckTimings()
+
+    def start(self) -> None:
+        self.mee6.start()
+
+    async def close(self) -> None:
+        await self.mee6.close()
+
+    def set_ttls(self, ttls: Dict[str, float]) -> None:
+        for provider, ttl in ttls.items():
+            if provider == "mee6":
+                self.mee6.interval = ttl
+            elif provider in self.caches:
+                self.caches[provider].ttl = ttl
+
+    async def _cached(self, provider: str, key: Hashable, fetch: Callable[[], Awaitable]):
+        cache = self.caches[provider]
+        value = cache.get(key)
+        if value is None:
+            try:
+                value = await self.flights[provider].do(key, fetch)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                log.warning(f"{provider} lookup failed: {exc!r}")
+                raise ProviderUnavailableError(
+                    f"Could not reach the {provider.title()} API, please try again later."
+                ) from exc
+            if value is not None:
+                cache.set(key, value)
+        return value
+
+    async def _token(self, service: str, name: str) -> str:
+        token = (await self.bot.get_shared_api_tokens(service)).get("authorization")
+        if token is None:
+            raise GiveawayExecError(f"The {name} token is not set.")
+        return token
+
+    async def mee6_level(self, guild_id: int, user_id: int) -> Optional[int]:
+        return await self.mee6.level(guild_id, user_id)
+
+    async def tatsu_profile(self, user_id: int) -> Optional[dict]:
+        token = await self._token("tatsumaki", "Tatsu")
+        return await self._cached(
+            "tatsu", user_id, lambda: get_tatsuinfo(self.http, token, user_id)
+        )
+
+    async def amari_member(self, guild_id: int, user_id: int) -> Optional[dict]:
+        token = await self._token("amari", "Amari")
+        return await self._cached(
+            "amari",
+            (guild_id, user_id),
+            lambda: get_amari_info(self.http, token, user_id, guild_id),
+        )
+
+    async def leveler_user(self, user_id: int) -> dict:
+        cog = self.bot.get_cog("Leveler")
+        if cog is None:
+            raise GiveawayExecError("The Leveler cog is not installed.")
+        userinfo = await self._cached(
+            "leveler", user_id, lambda: cog.db.users.find_one({"user_id": str(user_id)})
+        )
+        return userinfo or {}
+
+
+async def get_mee6_levels(http, guild, base_url=MEE6_LEADERBOARD_URL):
+    """Page through a guild's MEE6 leaderboard and map user ids to levels."""
+    levels = {}
+    for page in range(MEE6_MAX_PAGES):
+        data = await http.get_json(
+            "mee6", base_url, params={"guild": guild, "limit": MEE6_PAGE_SIZE, "page": page}
+        )
+        if data is None:
+            return None
+        players = data.get("players", [])
+        levels.update({int(player["id"]): player["level"] for player in players})
+        if len(players) < MEE6_PAGE_SIZE:
+            break
+    return levels
+
+
+async def get_tatsuinfo(http, token, userid):
+    return await http.get_json(
+        "tatsu", f"https://api.tatsu.gg/v1/users/{userid}/profile", headers={"Authorization": token}
+    )
+
+
+async def get_amari_info(http, token, userid, guildid):
+    return await http.get_json(
+        "amari",
+        f"https://amaribot.com/api/v1/guild/{guildid}/member/{userid}",
+        headers={"Authorization": token},
+    )
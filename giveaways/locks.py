@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+from typing import AsyncIterator, Dict, Hashable
+
+
+class SharedLock:
+    """Lock that many holders may share, or one may hold exclusively.
+
+    Once an exclusive holder is waiting no new shared holders are let in, so a
+    steady stream of shared holders cannot starve it.
+    """
+
+    def __init__(self) -> None:
+        self._cond = asyncio.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    def locked(self) -> bool:
+        return self._exclusive or self._shared > 0
+
+    async def acquire_shared(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._exclusive and not self._waiting)
+            self._shared += 1
+
+    async def release_shared(self) -> None:
+        async with self._cond:
+            self._shared -= 1
+            if not self._shared:
+                self._cond.notify_all()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            self._waiting += 1
+            try:
+                await self._cond.wait_for(lambda: not self._exclusive and not self._shared)
+            finally:
+                self._waiting -= 1
+                # Shared holders queued behind a cancelled waiter may go ahead now.
+                self._cond.notify_all()
+            self._exclusive = True
+
+    async def release(self) -> None:
+        async with self._cond:
+            self._exclusive = False
+            self._cond.notify_all()
+
+
+class GiveawayLocks:
+    """Lock table keyed by giveaway.
+
+    Entries hold a giveaway's lock shared, draws, edits and rerolls hold it
+    exclusively, so a giveaway cannot be drawn while an entry is half done.
+    Any hashable key works, entries also lock ``(message_id, user_id)`` so one
+    user's clicks are handled in order. Locks are reference counted and dropped
+    as soon as nobody holds or waits on them, so the table only holds keys in use.
+    """
+
+    def __init__(self) -> None:
+        self._locks: Dict[Hashable, SharedLock] = {}
+        self._users: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def locked(self, key: Hashable) -> bool:
+        lock = self._locks.get(key)
+        return lock is not None and lock.locked()
+
+    @contextlib.asynccontextmanager
+    async def _hold(self, key: Hashable, shared: bool) -> AsyncIterator[None]:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = SharedLock()
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            if shared:
+                await lock.acquire_shared()
+                try:
+                    yield
+                finally:
+                    await lock.release_shared()
+            else:
+                await lock.acquire()
+                try:
+                    yield
+                finally:
+                    await lock.release()
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+    def __call__(self, key: Hashable):
+        """Hold ``key`` exclusively."""
+        return self._hold(key, shared=False)
+
+    def shared(self, key: Hashable):
+        """Hold ``key`` alongside other shared holders."""
+        return self._hold(key, shared=True)
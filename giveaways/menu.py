@@ -1,14 +1,23 @@
+import asyncio
+import contextlib
 import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
 import discord
 from discord.ui import Button, View
 from .objects import AlreadyEnteredError, GiveawayEnterError, GiveawayExecError
 
 log = logging.getLogger("red.flare.giveaways")
 
+CUSTOM_ID = re.compile(r"giveaway_button:(?P<id>[0-9]+)")
+BUSY_MESSAGE = "This giveaway is very busy right now, please try again in a moment."
+ERROR_MESSAGE = "Something went wrong while entering you into this giveaway, please try again later."
+
 class GiveawayView(View):
-    def __init__(self, cog):
+    def __init__(self):
         super().__init__(timeout=None)
-        self.cog = cog
 
 BUTTON_STYLE = {
     "blurple": discord.ButtonStyle.primary,
@@ -19,42 +28,214 @@ BUTTON_STYLE = {
 }
 
 class GiveawayButton(Button):
-    def __init__(self, label: str, style: str, emoji, cog, id, update=False):
+    def __init__(self, label: str, style: str, emoji, id):
         super().__init__(label=label, style=BUTTON_STYLE.get(style, discord.ButtonStyle.green), emoji=emoji, custom_id=f"giveaway_button:{id}")
-        self.default_label = label
-        self.update = update
+
+
+def build_view(giveaway) -> GiveawayView:
+    """Build the view attached to a giveaway message.
+
+    The view is never registered with the bot, clicks are dispatched by `GiveawayRouter`.
+    It is returned stopped so `Message.edit` does not store it in the bot's view store.
+    """
+    label = giveaway.kwargs.get("button-text") or "Join Giveaway"
+    if giveaway.kwargs.get("update_button") and len(giveaway.entrants) >= 1:
+        label = f"{label} ({len(giveaway.entrants)})"
+    view = GiveawayView()
+    view.add_item(
+        GiveawayButton(
+            label=label,
+            style=giveaway.kwargs.get("button-style") or "green",
+            emoji=giveaway.emoji,
+            id=giveaway.messageid,
+        )
+    )
+    view.stop()
+    return view
+
+
+class GiveawayRouter:
+    """Dispatch giveaway button clicks by custom id.
+
+    A single router handles every giveaway, so no view has to be kept registered
+    per giveaway message.
+    """
+
+    def __init__(self, cog):
         self.cog = cog
+        self.closed = False
+
+    async def dispatch(self, interaction: discord.Interaction) -> bool:
+        """Handle ``interaction`` if it is a giveaway button click, returning whether it was."""
+        if interaction.type is not discord.InteractionType.component:
+            return False
+        match = CUSTOM_ID.fullmatch((interaction.data or {}).get("custom_id", ""))
+        if match is None:
+            return False
+        if self.closed:
+            await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+            return True
+        giveaway = self.cog.giveaways.get(int(match.group("id")))
+        if giveaway is None:
+            await interaction.response.send_message(f"This giveaway is no longer active.", ephemeral=True)
+            return True
+        await interaction.response.defer()
+        if not self.cog.entry_pool.submit(interaction, giveaway):
+            await self.reject(interaction, giveaway)
+        return True
+
+    async def reject(self, interaction: discord.Interaction, giveaway) -> None:
+        """Answer a deferred click that will not be processed."""
+        await interaction.followup.send(BUSY_MESSAGE, ephemeral=True)
 
-    async def callback(self, interaction: discord.Interaction):
-        if interaction.message.id in self.cog.giveaways:
-            giveaway = self.cog.giveaways[interaction.message.id]
-            await interaction.response.defer()
-            try:
-                await giveaway.add_entrant(interaction.user, bot=self.cog.bot, session=self.cog.session)
-                await self.cog.save_entrants(giveaway)
-                await interaction.followup.send(f"You have been entered into the giveaway for {giveaway.prize}.", ephemeral=True)
-            except GiveawayEnterError as e:
-                await interaction.followup.send(f"{e.message}", ephemeral=True)
-                return
-            except GiveawayExecError as e:
-                log.exception("Error while adding giveaway user to giveaway", exc_info=e)
-                return
-            except AlreadyEnteredError:
-                if interaction.user.id in giveaway.entrants:
-                    giveaway.entrants.remove(interaction.user.id)
-                    await self.cog.save_entrants(giveaway)
-                await interaction.followup.send(f"You have been removed from the giveaway.", ephemeral=True)
-            await self.update_label(giveaway, interaction)
+    async def process(self, interaction: discord.Interaction, giveaway) -> None:
+        """Enter or remove the user who clicked, run by the entry worker pool."""
+        # Entries are serialised per user so a double click cannot be charged twice, while
+        # different users go through their requirement checks concurrently. The giveaway
+        # itself is held shared, so it cannot be drawn or edited halfway through an entry.
+        async with self.cog.locks((giveaway.messageid, interaction.user.id)), self.cog.locks.shared(
+            giveaway.messageid
+        ):
+            reply = await self._enter(interaction, giveaway)
+        await interaction.followup.send(reply, ephemeral=True)
+
+    async def _enter(self, interaction: discord.Interaction, giveaway) -> str:
+        if giveaway.messageid not in self.cog.giveaways:
+            return "This giveaway is no longer active."
+        try:
+            await giveaway.add_entrant(interaction.user, integrations=self.cog.integrations)
+        except GiveawayEnterError as e:
+            return e.message
+        except GiveawayExecError as e:
+            log.exception("Error while adding giveaway user to giveaway", exc_info=e)
+            return ERROR_MESSAGE
+        except AlreadyEnteredError:
+            if interaction.user.id in giveaway.entrants:
+                giveaway.entrants.remove(interaction.user.id)
+            self.cog.entrant_buffer.record(giveaway.messageid, interaction.user.id, 0)
+            reply = "You have been removed from the giveaway."
         else:
-            await interaction.followup.send(f"This giveaway is no longer active.", ephemeral=True)
-
-    async def update_label(self, giveaway, interaction):
-        if self.update:
-            if len(giveaway.entrants) >= 1:
-                self.label = f"{self.default_label} ({len(giveaway.entrants)})"
-            else:
-                self.label = self.default_label
-            try:
-                await interaction.message.edit(view=self.view)
-            except discord.HTTPException as e:
-                log.error(f"Failed to update button label: {e}")
\ No newline at end of file
+            self.cog.entrant_buffer.record(
+                giveaway.messageid, interaction.user.id, giveaway.entrants.weight(interaction.user.id)
+            )
+            reply = f"You have been entered into the giveaway for {giveaway.prize}."
+        # Requested while the giveaway is held, a draw discards it before removing the view.
+        if giveaway.kwargs.get("update_button"):
+            self.cog.label_refresher.request(giveaway, interaction.message)
+        return reply
+
+
+class LabelRefresher:
+    """Debounced entrant count updates for giveaway buttons.
+
+    Each giveaway message is edited at most once every ``interval`` seconds, and
+    the edit always shows the entrant count at the time it is sent.
+    """
+
+    def __init__(self, interval: float = 5.0) -> None:
+        self.interval = interval
+        self._pending: Dict[int, Tuple[object, discord.Message]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._last_edit: Dict[int, float] = {}
+
+    def request(self, giveaway, message: discord.Message) -> None:
+        self._pending[giveaway.messageid] = (giveaway, message)
+        if giveaway.messageid not in self._tasks:
+            self._tasks[giveaway.messageid] = asyncio.create_task(
+                self._delayed_edit(giveaway.messageid)
+            )
+
+    def discard(self, messageid: int) -> None:
+        """Drop any pending update of a giveaway and stop tracking it, used once it has ended."""
+        task = self._tasks.pop(messageid, None)
+        if task is not None:
+            task.cancel()
+        self._pending.pop(messageid, None)
+        self._last_edit.pop(messageid, None)
+
+    async def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
+
+    async def _delayed_edit(self, messageid: int) -> None:
+        try:
+            delay = self._last_edit.get(messageid, 0) + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._edit(messageid)
+        finally:
+            if self._tasks.get(messageid) is asyncio.current_task():
+                del self._tasks[messageid]
+
+    async def _edit(self, messageid: int) -> Optional[discord.Message]:
+        item = self._pending.pop(messageid, None)
+        if item is None:
+            return None
+        giveaway, message = item
+        self._last_edit[messageid] = time.monotonic()
+        try:
+            return await message.edit(view=build_view(giveaway))
+        except discord.HTTPException as e:
+            log.error(f"Failed to update button label: {e}")
+
+
+class EntrantsMenu(View):
+    """Paginated entrant list rendering each page only when it is shown.
+
+    The entrants are snapshotted once as ``(user_id, weight)`` pairs, so flipping
+    pages costs one page worth of member lookups however large the giveaway is.
+    """
+
+    def __init__(self, ctx, entrants, *, per_page: int = 25, timeout: float = 180) -> None:
+        super().__init__(timeout=timeout)
+        self.ctx = ctx
+        self.items: List[Tuple[int, int]] = list(entrants.items())
+        self.per_page = per_page
+        self.pages = max(1, -(-len(self.items) // per_page))
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        if self.pages == 1:
+            self.clear_items()
+
+    def render(self) -> discord.Embed:
+        start = self.page * self.per_page
+        lines = []
+        for user_id, weight in self.items[start : start + self.per_page]:
+            member = self.ctx.guild.get_member(user_id)
+            lines.append(f"{member.mention} ({weight})" if member else f"<{user_id}> ({weight})")
+        embed = discord.Embed(title="Entrants", description="\n".join(lines), color=discord.Color.blue())
+        embed.set_footer(text=f"Total entrants: {len(self.items)} | Page {self.page + 1}/{self.pages}")
+        return embed
+
+    async def start(self) -> None:
+        self.message = await self.ctx.send(embed=self.render(), view=self if self.pages > 1 else None)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.ctx.author.id:
+            await interaction.response.send_message("This menu is not for you.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self) -> None:
+        if self.message is not None:
+            with contextlib.suppress(discord.HTTPException):
+                await self.message.edit(view=None)
+
+    async def _show(self, interaction: discord.Interaction, page: int) -> None:
+        self.page = page % self.pages
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(emoji="\N{LEFTWARDS BLACK ARROW}", style=discord.ButtonStyle.grey)
+    async def previous_page(self, interaction: discord.Interaction, button: Button) -> None:
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(emoji="\N{CROSS MARK}", style=discord.ButtonStyle.grey)
+    async def close_menu(self, interaction: discord.Interaction, button: Button) -> None:
+        self.stop()
+        await interaction.response.edit_message(view=None)
+
+    @discord.ui.button(emoji="\N{BLACK RIGHTWARDS ARROW}", style=discord.ButtonStyle.grey)
+    async def next_page(self, interaction: discord.Interaction, button: Button) -> None:
+        await self._show(interaction, self.page + 1)
@@ -1,12 +1,15 @@
+import asyncio
 import math
-import random
+import time
 from datetime import datetime, timezone
 from logging import getLogger
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, List, Mapping, Set, Union
 
 import discord
 from redbot.core import bank
 
+from .draw import weighted_sample
+
 log = getLogger("red.flare.giveaways")
 
 
@@ -27,6 +30,58 @@ class AlreadyEnteredError(GiveawayError):
     pass
 
 
+class ProviderUnavailableError(GiveawayEnterError):
+    pass
+
+
+class Entrants:
+    """Entrants of a giveaway as an insertion-ordered ``user_id -> weight`` map.
+
+    Iterating yields every user id repeated by its weight, matching the flat list
+    the entrants used to be stored as.
+    """
+
+    def __init__(self, entrants: Union[Mapping[int, int], Iterable[int], None] = None) -> None:
+        self._weights: Dict[int, int] = {}
+        self.total = 0
+        if isinstance(entrants, Mapping):
+            for user_id, weight in entrants.items():
+                self.add(user_id, weight)
+        elif entrants is not None:
+            for user_id in entrants:
+                self.add(user_id)
+
+    def add(self, user_id: int, weight: int = 1) -> None:
+        self._weights[user_id] = self._weights.get(user_id, 0) + weight
+        self.total += weight
+
+    def remove(self, user_id: int) -> int:
+        weight = self._weights.pop(user_id, 0)
+        self.total -= weight
+        return weight
+
+    def weight(self, user_id: int) -> int:
+        return self._weights.get(user_id, 0)
+
+    def items(self):
+        return self._weights.items()
+
+    def to_list(self) -> List[int]:
+        return [user_id for user_id, weight in self._weights.items() for _ in range(weight)]
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._weights
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def __bool__(self) -> bool:
+        return bool(self._weights)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.to_list())
+
+
 class Giveaway:
     def __init__(
         self,
@@ -45,222 +100,255 @@ class Giveaway:
         self.messageid = messageid
         self.endtime = endtime
         self.prize = prize
-        self.entrants = entrants or []
+        self.entrants = entrants
         self.emoji = emoji
         self.kwargs = kwargs
+        self.compile_requirements()
+
+    @property
+    def entrants(self) -> Entrants:
+        return self._entrants
+
+    @entrants.setter
+    def entrants(self, value) -> None:
+        self._entrants = value if isinstance(value, Entrants) else Entrants(value)
+
+    def compile_requirements(self) -> None:
+        """Rebuild the entry requirement pipeline, needed after ``kwargs`` changes."""
+        self._requirements = Requirements(self.guildid, self.kwargs)
 
-    async def add_entrant(
-        self, user: discord.Member, *, bot, session
-    ) -> Tuple[bool, GiveawayError]:
+    async def add_entrant(self, user: discord.Member, *, integrations) -> None:
         if not self.kwargs.get("multientry", False) and user.id in self.entrants:
             self.remove_entrant(user.id)
             raise AlreadyEnteredError("You have already entered this giveaway.")
-        bypass = self.does_entrant_bypass(user)
-        if bypass is False:
-            if self.kwargs.get("roles", []) and all(
-                int(role) not in [x.id for x in user.roles]
-                for role in self.kwargs.get("roles", [])
-            ):
-                raise GiveawayEnterError(
-                    "You do not have the required roles to join this giveaway."
-                )
-
-            if self.kwargs.get("blacklist", []) and any(
-                int(role) in [x.id for x in user.roles]
-                for role in self.kwargs.get("blacklist", [])
-            ):
-                raise GiveawayEnterError("Your role is blacklisted from this giveaway.")
-            if (
-                self.kwargs.get("joined", None) is not None
-                and (datetime.now(timezone.utc) - user.joined_at.replace(tzinfo=timezone.utc)).days
-                <= self.kwargs["joined"]
-            ):
-                raise GiveawayEnterError(
-                    f"Your account is too new to join this giveaway. You must have joined {self.kwargs['joined']} days ago."
-                )
-            if (
-                self.kwargs.get("created", None) is not None
-                and (
-                    datetime.now(timezone.utc) - user.created_at.replace(tzinfo=timezone.utc)
-                ).days
-                <= self.kwargs["created"]
-            ):
-                raise GiveawayEnterError(
-                    f"Your account is too new to join this giveaway. You must have created your account {self.kwargs['created']} days ago."
-                )
-            if self.kwargs.get("cost", None) is not None:
-                if not await bank.can_spend(user, self.kwargs["cost"]):
-                    raise GiveawayEnterError(
-                        "You do not have enough credits to join this giveaway."
-                    )
-
-                await bank.withdraw_credits(user, self.kwargs["cost"])
-            if self.kwargs.get("levelreq", None) is not None:
-                cog = bot.get_cog("Leveler")
-                if cog is None:
-                    raise GiveawayExecError("The Leveler cog is not installed.")
-                userinfo = await cog.db.users.find_one({"user_id": str(user.id)})
-                lvl = userinfo.get("servers", {}).get(str(self.guildid), {}).get("level", 0)
-                if lvl <= self.kwargs.get("levelreq", 0):
-                    raise GiveawayEnterError(
-                        f"You do not meet the required level to join this giveaway. You must be level {self.kwargs['levelreq']} or higher."
-                    )
-
-            if self.kwargs.get("repreq", None) is not None:
-                cog = bot.get_cog("Leveler")
-                if cog is None:
-                    raise GiveawayExecError("The Leveler cog is not installed.")
-                userinfo = await cog.db.users.find_one({"user_id": str(user.id)})
-                lvl = userinfo.get("servers", {}).get(str(self.guildid), {}).get("rep", 0)
-                if lvl <= self.kwargs.get("levelreq", 0):
-                    raise GiveawayEnterError(
-                        f"You do not meet the required rep to join this giveaway. You must have {self.kwargs['repreq']} or higher."
-                    )
-
-            if self.kwargs.get("mee6_level", None) is not None:
-                lb = await get_mee6lb(session, self.guildid)
-                if lb is None:
-                    raise GiveawayExecError("The MEE6 Leaderboard is not available.")
-                for user in lb:
-                    if user["id"] == str(user.id) and user["level"] < self.kwargs.get(
-                        "mee6-level", 0
-                    ):
-                        raise GiveawayEnterError(
-                            f"You do not meet the required MEE6 level to join this giveaway. You must be level {self.kwargs['mee6-level']} or higher."
-                        )
-
-            if self.kwargs.get("tatsu_level", None) is not None:
-                token = await bot.get_shared_api_tokens("tatsumaki")
-                if token.get("authorization") is None:
-                    raise GiveawayExecError("The Tatsu token is not set.")
-                uinfo = await get_tatsuinfo(session, token.get("authorization"), user.id)
-                if uinfo is None:
-                    raise GiveawayEnterError(
-                        "The Tatsu API did not return any data therefore you have not been entered."
-                    )
-                if int((1 / 278) * (9 + math.sqrt(81 + 1112 * uinfo["xp"]))) < self.kwargs.get(
-                    "tatsu_level", 0
-                ):
-                    raise GiveawayEnterError(
-                        f"You do not meet the required Tatsu level to join this giveaway. You must be level {self.kwargs['tatsu_level']} or higher."
-                    )
-
-            if self.kwargs.get("tatsu_rep", None) is not None:
-                token = bot.get_shared_api_tokens("tatsumaki")
-                if token.get("authorization") is None:
-                    raise GiveawayExecError("The Tatsu token is not set.")
-                uinfo = await get_tatsuinfo(session, token.get("authorization"), user.id)
-                if uinfo is None:
-                    raise GiveawayEnterError(
-                        "The Tatsu API did not return any data therefore you have not been entered."
-                    )
-                if uinfo["reputation"] < self.kwargs.get("tatsu_rep", 0):
-                    raise GiveawayEnterError(
-                        f"You do not meet the required Tatsu rep to join this giveaway. You must have {self.kwargs['tatsu_rep']} or higher."
-                    )
-
-            if self.kwargs.get("amari_level", None) is not None:
-                token = bot.get_shared_api_tokens("amari")
-                if token.get("authorization") is None:
-                    raise GiveawayExecError("The Amari token is not set.")
-                uinfo = await get_amari_info(
-                    session, token.get("authorization"), user.id, self.guildid
-                )
-                if uinfo is None:
-                    raise GiveawayEnterError(
-                        "The Amari API did not return any data therefore you have not been entered."
-                    )
-                if uinfo["level"] < self.kwargs.get("amari_level", 0):
-                    raise GiveawayEnterError(
-                        f"You do not meet the required Amari level to join this giveaway. You must be level {self.kwargs['amari_level']} or higher."
-                    )
-
-            if self.kwargs.get("amari_weekly_xp", None) is not None:
-                token = bot.get_shared_api_tokens("amari")
-                if token.get("authorization") is None:
-                    raise GiveawayExecError("The Amari token is not set.")
-                uinfo = await get_amari_info(
-                    session, token.get("authorization"), user.id, self.guildid
-                )
-                if uinfo is None:
-                    raise GiveawayEnterError(
-                        "The Amari API did not return any data therefore you have not been entered."
-                    )
-                if uinfo["level"] < self.kwargs.get("amari_weekly_xp", 0):
-                    raise GiveawayEnterError(
-                        f"You do not meet the required Amari weekly XP to join this giveaway. You must have {self.kwargs['amari_weekly_xp']} or higher."
-                    )
-
-        self.entrants.append(user.id)
-        if self.kwargs.get("multi", None) is not None and any(
-            int(role) in [x.id for x in user.roles] for role in self.kwargs.get("multi-roles", [])
-        ):
-            for _ in range(self.kwargs["multi"] - 1):
-                self.entrants.append(user.id)
-        return
+        weight = await self._requirements.check(user, integrations)
+        self.entrants.add(user.id, weight)
 
     def remove_entrant(self, userid: int) -> None:
-        self.entrants = [x for x in self.entrants if x != userid]
+        self.entrants.remove(userid)
 
     def draw_winner(self):
         winner_count = self.kwargs.get("winners") or 1
         if len(self.entrants) < winner_count:
             return None
-        winners = random.sample(self.entrants, winner_count)
-        self.remove_entrant(winners)
+        winners = weighted_sample(self.entrants.items(), winner_count)
+        for winner in winners:
+            self.remove_entrant(winner)
         return winners
 
     def does_entrant_bypass(self, user: discord.Member) -> bool:
-        if not self.kwargs.get("bypass-roles", []):
+        return self._requirements.bypasses({x.id for x in user.roles})
+
+    def __str__(self) -> str:
+        return f"{self.prize} - {self.endtime}"
+
+
+class Requirements:
+    """Entry requirements of a giveaway, compiled once from its arguments.
+
+    Checks run cheapest first and stop at the first failure: role and account
+    age checks, then the bank balance, then the third party integrations.
+    The integration checks are independent and run concurrently, each within
+    ``integrations.check_timeout`` and all of them within
+    ``integrations.entry_deadline``. Credits are only withdrawn once every
+    other check has passed.
+    """
+
+    def __init__(self, guildid: int, kwargs: dict) -> None:
+        self.guildid = guildid
+        self.roles = frozenset(int(role) for role in kwargs.get("roles") or [])
+        self.blacklist = frozenset(int(role) for role in kwargs.get("blacklist") or [])
+        self.bypass_roles = frozenset(int(role) for role in kwargs.get("bypass-roles") or [])
+        self.bypass_type = kwargs.get("bypass-type")
+        self.multi = kwargs.get("multi")
+        self.multi_roles = frozenset(int(role) for role in kwargs.get("multi-roles") or [])
+        self.joined = kwargs.get("joined")
+        self.created = kwargs.get("created")
+        self.cost = kwargs.get("cost")
+        self.levelreq = kwargs.get("levelreq")
+        self.repreq = kwargs.get("repreq")
+        self.mee6_level = kwargs.get("mee6_level")
+        self.tatsu_level = kwargs.get("tatsu_level")
+        self.tatsu_rep = kwargs.get("tatsu_rep")
+        self.amari_level = kwargs.get("amari_level")
+        self.amari_weekly_xp = kwargs.get("amari_weekly_xp")
+
+        self.local_checks = []
+        if self.roles:
+            self.local_checks.append(self._check_roles)
+        if self.blacklist:
+            self.local_checks.append(self._check_blacklist)
+        if self.joined is not None:
+            self.local_checks.append(self._check_joined)
+        if self.created is not None:
+            self.local_checks.append(self._check_created)
+
+        self.remote_checks = []
+        if self.levelreq is not None:
+            self.remote_checks.append(self._check_leveler_level)
+        if self.repreq is not None:
+            self.remote_checks.append(self._check_leveler_rep)
+        if self.mee6_level is not None:
+            self.remote_checks.append(self._check_mee6_level)
+        if self.tatsu_level is not None:
+            self.remote_checks.append(self._check_tatsu_level)
+        if self.tatsu_rep is not None:
+            self.remote_checks.append(self._check_tatsu_rep)
+        if self.amari_level is not None:
+            self.remote_checks.append(self._check_amari_level)
+        if self.amari_weekly_xp is not None:
+            self.remote_checks.append(self._check_amari_weekly_xp)
+
+    def bypasses(self, role_ids: Set[int]) -> bool:
+        if not self.bypass_roles:
             return False
-        bypass_type = self.kwargs.get("bypass-type")
-        if bypass_type == "or":
-            return any(
-                list(
-                    int(role) in [x.id for x in user.roles]
-                    for role in self.kwargs.get("bypass-roles")
+        if self.bypass_type == "or":
+            return not self.bypass_roles.isdisjoint(role_ids)
+        if self.bypass_type == "and":
+            return self.bypass_roles <= role_ids
+        return False
+
+    def weight(self, role_ids: Set[int]) -> int:
+        if self.multi is not None and not self.multi_roles.isdisjoint(role_ids):
+            # Giveaways stored before the multiplier was validated may hold values below 1.
+            return max(1, self.multi)
+        return 1
+
+    async def check(self, user: discord.Member, integrations) -> int:
+        """Raise if ``user`` may not enter, otherwise return their entry weight."""
+        role_ids = {x.id for x in user.roles}
+        if not self.bypasses(role_ids):
+            for check in self.local_checks:
+                check(user, role_ids)
+            if self.cost is not None and not await bank.can_spend(user, self.cost):
+                raise GiveawayEnterError("You do not have enough credits to join this giveaway.")
+            if self.remote_checks:
+                await self._run_remote_checks(user, integrations)
+            if self.cost is not None:
+                await bank.withdraw_credits(user, self.cost)
+        return self.weight(role_ids)
+
+    async def _run_remote_checks(self, user: discord.Member, integrations) -> None:
+        async def timed(check) -> None:
+            name = check.__name__[len("_check_") :]
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(check(user, integrations), timeout=integrations.check_timeout)
+            except asyncio.TimeoutError:
+                integrations.timings.record(name, time.perf_counter() - start, timed_out=True)
+                raise GiveawayEnterError(
+                    "A requirement check took too long to respond, please try again later."
                 )
+            integrations.timings.record(name, time.perf_counter() - start)
+
+        tasks = [asyncio.create_task(timed(check)) for check in self.remote_checks]
+        try:
+            done, pending = await asyncio.wait(
+                tasks, timeout=integrations.entry_deadline, return_when=asyncio.FIRST_EXCEPTION
             )
-        elif bypass_type == "and":
-            return all(
-                list(
-                    int(role) in [x.id for x in user.roles]
-                    for role in self.kwargs.get("bypass-roles")
-                )
+        finally:
+            for task in tasks:
+                task.cancel()
+        # Report the first failing check in declaration order, not whichever finished first.
+        errors = [task.exception() for task in tasks if task in done]
+        for error in errors:
+            if error is not None:
+                raise error
+        if pending:
+            raise GiveawayEnterError("Checking the requirements took too long, please try again later.")
+
+    def _check_roles(self, user: discord.Member, role_ids: Set[int]) -> None:
+        if self.roles.isdisjoint(role_ids):
+            raise GiveawayEnterError("You do not have the required roles to join this giveaway.")
+
+    def _check_blacklist(self, user: discord.Member, role_ids: Set[int]) -> None:
+        if not self.blacklist.isdisjoint(role_ids):
+            raise GiveawayEnterError("Your role is blacklisted from this giveaway.")
+
+    def _check_joined(self, user: discord.Member, role_ids: Set[int]) -> None:
+        joined_at = user.joined_at.replace(tzinfo=timezone.utc)
+        if (datetime.now(timezone.utc) - joined_at).days <= self.joined:
+            raise GiveawayEnterError(
+                f"Your account is too new to join this giveaway. You must have joined {self.joined} days ago."
             )
-        else:
-            return False
 
-    def __str__(self) -> str:
-        return f"{self.prize} - {self.endtime}"
+    def _check_created(self, user: discord.Member, role_ids: Set[int]) -> None:
+        created_at = user.created_at.replace(tzinfo=timezone.utc)
+        if (datetime.now(timezone.utc) - created_at).days <= self.created:
+            raise GiveawayEnterError(
+                f"Your account is too new to join this giveaway. You must have created your account {self.created} days ago."
+            )
 
+    async def _get_leveler_info(self, user: discord.Member, integrations) -> dict:
+        userinfo = await integrations.leveler_user(user.id)
+        return userinfo.get("servers", {}).get(str(self.guildid), {})
 
-async def get_mee6lb(session, guild):
-    async with session.get(
-        f"https://mee6.xyz/api/plugins/leaderboard/leaderboard?guild={guild}&limit=1000"
-    ) as r:
-        if r.status != 200:
-            return None
-        data = await r.json()
-        return data["players"]
+    async def _check_leveler_level(self, user: discord.Member, integrations) -> None:
+        info = await self._get_leveler_info(user, integrations)
+        if info.get("level", 0) <= self.levelreq:
+            raise GiveawayEnterError(
+                f"You do not meet the required level to join this giveaway. You must be level {self.levelreq} or higher."
+            )
 
+    async def _check_leveler_rep(self, user: discord.Member, integrations) -> None:
+        info = await self._get_leveler_info(user, integrations)
+        if info.get("rep", 0) <= self.repreq:
+            raise GiveawayEnterError(
+                f"You do not meet the required rep to join this giveaway. You must have {self.repreq} or higher."
+            )
 
-async def get_tatsuinfo(session, token, userid):
-    async with session.get(
-        f"https://api.tatsu.gg/v1/users/{userid}/profile", headers={"Authorization": token}
-    ) as r:
-        if r.status != 200:
-            return None
-        data = await r.json()
-        return data
+    async def _check_mee6_level(self, user: discord.Member, integrations) -> None:
+        level = await integrations.mee6_level(self.guildid, user.id)
+        if level is None:
+            raise ProviderUnavailableError(
+                "The MEE6 leaderboard is currently unavailable, please try again later."
+            )
+        if level < self.mee6_level:
+            raise GiveawayEnterError(
+                f"You do not meet the required MEE6 level to join this giveaway. You must be level {self.mee6_level} or higher."
+            )
+
+    async def _get_tatsu_info(self, user: discord.Member, integrations) -> dict:
+        uinfo = await integrations.tatsu_profile(user.id)
+        if uinfo is None:
+            raise GiveawayEnterError(
+                "The Tatsu API did not return any data therefore you have not been entered."
+            )
+        return uinfo
 
+    async def _check_tatsu_level(self, user: discord.Member, integrations) -> None:
+        uinfo = await self._get_tatsu_info(user, integrations)
+        if int((1 / 278) * (9 + math.sqrt(81 + 1112 * uinfo["xp"]))) < self.tatsu_level:
+            raise GiveawayEnterError(
+                f"You do not meet the required Tatsu level to join this giveaway. You must be level {self.tatsu_level} or higher."
+            )
+
+    async def _check_tatsu_rep(self, user: discord.Member, integrations) -> None:
+        uinfo = await self._get_tatsu_info(user, integrations)
+        if uinfo["reputation"] < self.tatsu_rep:
+            raise GiveawayEnterError(
+                f"You do not meet the required Tatsu rep to join this giveaway. You must have {self.tatsu_rep} or higher."
+            )
+
+    async def _get_amari_info(self, user: discord.Member, integrations) -> dict:
+        uinfo = await integrations.amari_member(self.guildid, user.id)
+        if uinfo is None:
+            raise GiveawayEnterError(
+                "The Amari API did not return any data therefore you have not been entered."
+            )
+        return uinfo
+
+    async def _check_amari_level(self, user: discord.Member, integrations) -> None:
+        uinfo = await self._get_amari_info(user, integrations)
+        if uinfo["level"] < self.amari_level:
+            raise GiveawayEnterError(
+                f"You do not meet the required Amari level to join this giveaway. You must be level {self.amari_level} or higher."
+            )
+
+    async def _check_amari_weekly_xp(self, user: discord.Member, integrations) -> None:
+        uinfo = await self._get_amari_info(user, integrations)
+        if uinfo.get("weeklyExp", 0) < self.amari_weekly_xp:
+            raise GiveawayEnterError(
+                f"You do not meet the required Amari weekly XP to join this giveaway. You must have {self.amari_weekly_xp} or higher."
+            )
 
-async def get_amari_info(session, token, userid, guildid):
-    async with session.get(
-        f"https://amaribot.com/api/v1/guild/{guildid}/member/{userid}",
-        headers={"Authorization": token},
-    ) as r:
-        if r.status != 200:
-            return None
-        data = await r.json()
-        return data
\ No newline at end of file
@@ -1,14 +1,44 @@
 from piccolo.conf.apps import AppConfig
-from piccolo.columns import BigInt, Array, Timestamp
+from piccolo.columns import BigInt, Array, Boolean, Integer, Real, Text, Timestamp
 from piccolo.table import Table
 from piccolo.engine.sqlite import SQLiteEngine
 from redbot.core.data_manager import cog_data_path
 import logging
+import sqlite3
 
 log = logging.getLogger("red.flare.giveaways")
 
 # SQLite configuration
 DB = SQLiteEngine(path=str(cog_data_path(raw_name="Giveaways") / "giveaways.sqlite"))
+DEFAULT_CONNECTION_KWARGS = dict(DB.connection_kwargs)
+
+# Per-connection settings of the "tuned" profile, the journal mode is stored in the file itself.
+TUNED_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # 16 MiB
+    "PRAGMA mmap_size = 268435456",  # 256 MiB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+ENGINE_PROFILES = ("default", "tuned")
+
+
+class TunedConnection(sqlite3.Connection):
+    """Connection applying ``TUNED_PRAGMAS`` as soon as it is opened."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        for pragma in TUNED_PRAGMAS:
+            self.execute(pragma)
+
+
+def use_engine_profile(profile: str) -> None:
+    """Switch the connection settings of ``DB``, applies to connections opened afterwards."""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown engine profile {profile!r}")
+    DB.connection_kwargs = dict(DEFAULT_CONNECTION_KWARGS)
+    if profile == "tuned":
+        DB.connection_kwargs.update(factory=TunedConnection, timeout=5.0, cached_statements=256)
 
 class GiveawayEntry(Table, db=DB):
     guild_id = BigInt()
@@ -17,10 +47,29 @@ class GiveawayEntry(Table, db=DB):
     created_at = Timestamp()
     updated_at = Timestamp(auto_update=True)
 
+class GiveawayEntrant(Table, db=DB, tablename="giveaway_entrant"):
+    # (message_id, user_id) is unique, enforced by an index created in storage.create_tables
+    message_id = BigInt(index=True)
+    user_id = BigInt()
+    weight = Integer(default=1)
+    entered_at = Timestamp()
+
+class GiveawayRecord(Table, db=DB, tablename="giveaway"):
+    # message_id is unique, (ended, endtime) and reap_after are indexed, see storage.create_tables
+    message_id = BigInt()
+    guild_id = BigInt()
+    channel_id = BigInt()
+    prize = Text()
+    emoji = Text()
+    endtime = Real()  # POSIX timestamp
+    kwargs = Text(default="{}")  # JSON
+    ended = Boolean(default=False)
+    reap_after = Real(null=True)  # POSIX timestamp after which an ended giveaway is deleted
+
 APP_CONFIG = AppConfig(
     app_name="giveaways",
     migrations_folder_path="",
-    table_classes=[GiveawayEntry],
+    table_classes=[GiveawayEntry, GiveawayEntrant, GiveawayRecord],
 )
 
 log.info(f"Initialized SQLite database at: {DB.path}")
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Optional
+
+log = getLogger("red.flare.giveaways")
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens a second, holding up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds``, used when the provider asks us to back off."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+
+class CircuitBreaker:
+    """Stop calling a provider after ``threshold`` consecutive failures.
+
+    While open every call is refused. After ``reset_after`` seconds a single
+    probe request is let through, its outcome closing or reopening the circuit.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0) -> None:
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        now = time.monotonic()
+        # A probe that never reported back, e.g. because it was cancelled, expires too.
+        if self._probe_at is None or now - self._probe_at >= self.reset_after:
+            self._probe_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_at = None
+        if self.failures >= self.threshold:
+            if self._opened_at is None or self.state != "open":
+                log.warning(f"Opening circuit after {self.failures} consecutive failures")
+            self._opened_at = time.monotonic()
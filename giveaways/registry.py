@@ -0,0 +1,65 @@
+import bisect
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .objects import Giveaway
+
+
+class GiveawayRegistry(MutableMapping):
+    """Active giveaways by message id, indexed by guild.
+
+    Each guild keeps its ``(endtime, message_id)`` pairs in a sorted list, so one
+    guild's giveaways can be listed soonest ending first without scanning the
+    giveaways of every other guild. Assigning a giveaway again, as ``edit`` does
+    after changing its end time, moves it to its new position.
+    """
+
+    def __init__(self) -> None:
+        self._giveaways: Dict[int, Giveaway] = {}
+        self._by_guild: Dict[int, List[Tuple[float, int]]] = {}
+        self._keys: Dict[int, Tuple[int, Tuple[float, int]]] = {}
+
+    def __getitem__(self, messageid: int) -> Giveaway:
+        return self._giveaways[messageid]
+
+    def __setitem__(self, messageid: int, giveaway: Giveaway) -> None:
+        if messageid in self._giveaways:
+            self._unindex(messageid)
+        self._giveaways[messageid] = giveaway
+        key = (giveaway.endtime.timestamp(), messageid)
+        bisect.insort(self._by_guild.setdefault(giveaway.guildid, []), key)
+        self._keys[messageid] = (giveaway.guildid, key)
+
+    def __delitem__(self, messageid: int) -> None:
+        del self._giveaways[messageid]
+        self._unindex(messageid)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._giveaways)
+
+    def __len__(self) -> int:
+        return len(self._giveaways)
+
+    def __contains__(self, messageid: object) -> bool:
+        return messageid in self._giveaways
+
+    def _unindex(self, messageid: int) -> None:
+        guildid, key = self._keys.pop(messageid)
+        keys = self._by_guild[guildid]
+        del keys[bisect.bisect_left(keys, key)]
+        if not keys:
+            del self._by_guild[guildid]
+
+    def in_guild(self, guildid: int, messageid: int) -> Optional[Giveaway]:
+        """Return the giveaway if it is active and belongs to ``guildid``."""
+        giveaway = self._giveaways.get(messageid)
+        if giveaway is None or giveaway.guildid != guildid:
+            return None
+        return giveaway
+
+    def for_guild(self, guildid: int) -> List[Giveaway]:
+        """Active giveaways of a guild, soonest ending first."""
+        return [self._giveaways[messageid] for _, messageid in self._by_guild.get(guildid, ())]
+
+    def guild_count(self, guildid: int) -> int:
+        return len(self._by_guild.get(guildid, ()))
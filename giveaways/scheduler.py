@@ -0,0 +1,82 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from logging import getLogger
+from typing import Dict, List, Optional, Tuple
+
+log = getLogger("red.flare.giveaways")
+
+
+class GiveawayScheduler:
+    """Deadline scheduler for giveaways.
+
+    Keeps a min-heap of ``(endtime, message_id)`` pairs and sleeps until the
+    earliest one is due. Rescheduling and cancelling are lazy: the heap may hold
+    stale entries which are discarded when they reach the top.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int]] = []
+        self._deadlines: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, messageid: int) -> bool:
+        return messageid in self._deadlines
+
+    def schedule(self, messageid: int, endtime: datetime) -> None:
+        """Schedule or reschedule a giveaway to end at ``endtime``."""
+        deadline = endtime.timestamp()
+        self._deadlines[messageid] = deadline
+        heapq.heappush(self._heap, (deadline, messageid))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+        if self._heap[0] == (deadline, messageid):
+            self._wakeup.set()
+
+    def cancel(self, messageid: int) -> None:
+        """Remove a giveaway from the schedule."""
+        self._deadlines.pop(messageid, None)
+
+    def next_deadline(self) -> Optional[float]:
+        """Return the earliest live deadline as a POSIX timestamp."""
+        while self._heap:
+            deadline, messageid = self._heap[0]
+            if self._deadlines.get(messageid) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: Optional[float] = None) -> List[int]:
+        """Pop every giveaway whose deadline is at or before ``now``."""
+        now = time.time() if now is None else now
+        due = []
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, messageid = heapq.heappop(self._heap)
+            del self._deadlines[messageid]
+            due.append(messageid)
+        return due
+
+    async def wait_for_due(self) -> List[int]:
+        """Sleep until at least one giveaway is due and return the due ids."""
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            if deadline is not None:
+                delay = deadline - time.time()
+                if delay <= 0:
+                    return self.pop_due()
+            else:
+                delay = None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _compact(self) -> None:
+        self._heap = [(d, m) for m, d in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        log.debug(f"Compacted giveaway schedule to {len(self._heap)} entries")
@@ -0,0 +1,94 @@
+import json
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from logging import getLogger
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .objects import Entrants, Giveaway
+from .piccolo_app import DB
+
+log = getLogger("red.flare.giveaways")
+
+SNAPSHOT_MAGIC = b"GWSNAP1\n"
+# Time the snapshot was written and CRC32 of the compressed payload.
+SNAPSHOT_HEADER = struct.Struct("<dI")
+
+
+def snapshot_path() -> Path:
+    return Path(DB.path).with_name("giveaways.snapshot")
+
+
+def _database_mtime() -> float:
+    paths = (DB.path, f"{DB.path}-wal")
+    return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=0.0)
+
+
+def dump_giveaways(giveaways: Iterable[Giveaway]) -> list:
+    """Plain rows of the giveaways and their entrants, ready for ``write_snapshot``."""
+    return [
+        [
+            giveaway.guildid,
+            giveaway.channelid,
+            giveaway.messageid,
+            giveaway.endtime.timestamp(),
+            giveaway.prize,
+            str(giveaway.emoji),
+            {k: v for k, v in giveaway.kwargs.items() if k != "colour"},
+            [user_id for user_id, _ in giveaway.entrants.items()],
+            [weight for _, weight in giveaway.entrants.items()],
+        ]
+        for giveaway in giveaways
+    ]
+
+
+def write_snapshot(rows: list, path: Optional[Path] = None) -> int:
+    """Write ``rows`` from ``dump_giveaways`` in one go, returning the snapshot size in bytes."""
+    path = path or snapshot_path()
+    payload = zlib.compress(json.dumps(rows, separators=(",", ":"), default=str).encode(), 1)
+    data = SNAPSHOT_MAGIC + SNAPSHOT_HEADER.pack(time.time(), zlib.crc32(payload)) + payload
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read_snapshot(path: Optional[Path] = None) -> Optional[List[Giveaway]]:
+    """Load and remove the snapshot, if there is one that is intact and newer than the database."""
+    path = path or snapshot_path()
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    path.unlink()
+    header_end = len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size
+    if len(data) < header_end or not data.startswith(SNAPSHOT_MAGIC):
+        log.warning("Ignoring giveaway snapshot with an unknown format.")
+        return None
+    written_at, checksum = SNAPSHOT_HEADER.unpack_from(data, len(SNAPSHOT_MAGIC))
+    payload = data[header_end:]
+    if zlib.crc32(payload) != checksum:
+        log.warning("Ignoring giveaway snapshot with a bad checksum.")
+        return None
+    if _database_mtime() > written_at:
+        log.info("Ignoring giveaway snapshot older than the database.")
+        return None
+    giveaways = []
+    for guildid, channelid, messageid, endtime, prize, emoji, kwargs, users, weights in json.loads(
+        zlib.decompress(payload)
+    ):
+        giveaway = Giveaway(
+            guildid,
+            channelid,
+            messageid,
+            datetime.fromtimestamp(endtime, tz=timezone.utc),
+            prize,
+            emoji,
+            **kwargs,
+        )
+        giveaway.entrants = Entrants(dict(zip(users, weights)))
+        giveaways.append(giveaway)
+    return giveaways
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .objects import Entrants, Giveaway
+from .piccolo_app import DB, GiveawayEntrant, GiveawayEntry, GiveawayRecord, use_engine_profile
+
+log = getLogger("red.flare.giveaways")
+
+# Keeps multi-row statements and IN (...) lists under SQLite's bound parameter limit.
+ROWS_PER_STATEMENT = 100
+IDS_PER_QUERY = 500
+
+
+async def create_tables() -> None:
+    async with DB.transaction():
+        await GiveawayEntry.create_table(if_not_exists=True).run()
+        await GiveawayEntrant.create_table(if_not_exists=True).run()
+        await GiveawayEntrant.raw(
+            "CREATE UNIQUE INDEX IF NOT EXISTS giveaway_entrant_key "
+            "ON giveaway_entrant (message_id, user_id)"
+        ).run()
+        await GiveawayRecord.create_table(if_not_exists=True).run()
+        await GiveawayRecord.raw(
+            "CREATE UNIQUE INDEX IF NOT EXISTS giveaway_message_id ON giveaway (message_id)"
+        ).run()
+        # Replaced by giveaway_ended_endtime, no query filtered on the guild first.
+        await GiveawayRecord.raw("DROP INDEX IF EXISTS giveaway_guild_ended_endtime").run()
+        await GiveawayRecord.raw(
+            "CREATE INDEX IF NOT EXISTS giveaway_ended_endtime ON giveaway (ended, endtime)"
+        ).run()
+        columns = {row["name"] for row in await GiveawayRecord.raw("PRAGMA table_info(giveaway)").run()}
+        if "reap_after" not in columns:
+            await GiveawayRecord.raw("ALTER TABLE giveaway ADD COLUMN reap_after REAL").run()
+        await GiveawayRecord.raw(
+            "CREATE INDEX IF NOT EXISTS giveaway_reap_after ON giveaway (reap_after) WHERE reap_after IS NOT NULL"
+        ).run()
+
+
+async def apply_engine_profile(profile: str) -> str:
+    """Switch ``DB`` to ``profile`` and set the matching journal mode, returning the mode in use."""
+    use_engine_profile(profile)
+    journal_mode = "WAL" if profile == "tuned" else "DELETE"
+    rows = await GiveawayEntrant.raw(f"PRAGMA journal_mode = {journal_mode}").run()
+    return rows[0]["journal_mode"] if rows else journal_mode
+
+
+async def benchmark_writes(samples: int = 50) -> List[float]:
+    """Time ``samples`` single entrant writes, each in its own transaction like an unbuffered click.
+
+    Rows are written under a negative message id, which no giveaway uses, and removed afterwards.
+    """
+    message_id = -int(time.time())
+    latencies = []
+    try:
+        for user_id in range(samples):
+            start = time.perf_counter()
+            await write_entrant_changes({message_id: {user_id: 1}})
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await GiveawayEntrant.delete().where(GiveawayEntrant.message_id == message_id).run()
+    return latencies
+
+
+def _to_giveaway(row: dict) -> Giveaway:
+    return Giveaway(
+        row["guild_id"],
+        row["channel_id"],
+        row["message_id"],
+        datetime.fromtimestamp(row["endtime"], tz=timezone.utc),
+        row["prize"],
+        row["emoji"],
+        **json.loads(row["kwargs"] or "{}"),
+    )
+
+
+async def save_giveaways(giveaways: Iterable[Giveaway], *, ended: bool = False) -> None:
+    """Insert or update the metadata of giveaways in one transaction."""
+    rows = [
+        (
+            giveaway.messageid,
+            giveaway.guildid,
+            giveaway.channelid,
+            giveaway.prize,
+            str(giveaway.emoji),
+            giveaway.endtime.timestamp(),
+            json.dumps({k: v for k, v in giveaway.kwargs.items() if k != "colour"}, default=str),
+            ended,
+        )
+        for giveaway in giveaways
+    ]
+    async with DB.transaction():
+        for i in range(0, len(rows), ROWS_PER_STATEMENT):
+            chunk = rows[i : i + ROWS_PER_STATEMENT]
+            values = ", ".join(["({}, {}, {}, {}, {}, {}, {}, {})"] * len(chunk))
+            await GiveawayRecord.raw(
+                "INSERT INTO giveaway (message_id, guild_id, channel_id, prize, emoji, endtime, kwargs, ended) "
+                f"VALUES {values} ON CONFLICT (message_id) DO UPDATE SET "
+                "channel_id = excluded.channel_id, prize = excluded.prize, emoji = excluded.emoji, "
+                "endtime = excluded.endtime, kwargs = excluded.kwargs, ended = excluded.ended",
+                *[arg for row in chunk for arg in row],
+            ).run()
+
+
+async def load_giveaway(message_id: int) -> Optional[Giveaway]:
+    row = await GiveawayRecord.select().where(GiveawayRecord.message_id == message_id).first().run()
+    return _to_giveaway(row) if row is not None else None
+
+
+async def load_active_giveaways() -> List[Giveaway]:
+    """Load the giveaways that have not ended, soonest to end first."""
+    rows = (
+        await GiveawayRecord.select()
+        .where(GiveawayRecord.ended.eq(False))
+        .order_by(GiveawayRecord.endtime)
+        .run()
+    )
+    return [_to_giveaway(row) for row in rows]
+
+
+async def mark_giveaways_ended(message_ids: Iterable[int], reap_after: float) -> None:
+    """Flag giveaways as ended, to be deleted by ``reap_ended_giveaways`` after ``reap_after``."""
+    message_ids = list(message_ids)
+    for i in range(0, len(message_ids), IDS_PER_QUERY):
+        await GiveawayRecord.update(
+            {GiveawayRecord.ended: True, GiveawayRecord.reap_after: reap_after}
+        ).where(GiveawayRecord.message_id.is_in(message_ids[i : i + IDS_PER_QUERY])).run()
+
+
+async def reap_ended_giveaways(now: float, limit: int) -> int:
+    """Delete up to ``limit`` ended giveaways due by ``now``, oldest first, returning how many were deleted."""
+    rows = await GiveawayRecord.raw(
+        "SELECT message_id FROM giveaway WHERE reap_after <= {} ORDER BY reap_after LIMIT {}", now, limit
+    ).run()
+    await delete_giveaways(row["message_id"] for row in rows)
+    return len(rows)
+
+
+async def next_reap_time() -> Optional[float]:
+    """When the next ended giveaway is due to be deleted, if any is."""
+    rows = await GiveawayRecord.raw(
+        "SELECT MIN(reap_after) AS reap_after FROM giveaway WHERE reap_after IS NOT NULL"
+    ).run()
+    return rows[0]["reap_after"] if rows else None
+
+
+async def _upsert_entrants(rows: List[Tuple[int, int, int]], *, replace: bool = True) -> None:
+    """Insert ``(message_id, user_id, weight)`` rows, updating the weight of existing ones."""
+    now = datetime.now(timezone.utc)
+    conflict = "DO UPDATE SET weight = excluded.weight" if replace else "DO NOTHING"
+    for i in range(0, len(rows), ROWS_PER_STATEMENT):
+        chunk = rows[i : i + ROWS_PER_STATEMENT]
+        values = ", ".join(["({}, {}, {}, {})"] * len(chunk))
+        args = [arg for message_id, user_id, weight in chunk for arg in (message_id, user_id, weight, now)]
+        await GiveawayEntrant.raw(
+            "INSERT INTO giveaway_entrant (message_id, user_id, weight, entered_at) "
+            f"VALUES {values} ON CONFLICT (message_id, user_id) {conflict}",
+            *args,
+        ).run()
+
+
+async def write_entrant_changes(changes: Dict[int, Dict[int, int]]) -> None:
+    """Apply buffered joins and leaves in one transaction.
+
+    ``changes`` maps a message id to ``{user_id: weight}``, a weight of 0 meaning the user left.
+    """
+    async with DB.transaction():
+        upserts = []
+        for message_id, users in changes.items():
+            left = [user_id for user_id, weight in users.items() if weight <= 0]
+            upserts.extend(
+                (message_id, user_id, weight) for user_id, weight in users.items() if weight > 0
+            )
+            if left:
+                await GiveawayEntrant.delete().where(
+                    (GiveawayEntrant.message_id == message_id)
+                    & GiveawayEntrant.user_id.is_in(left)
+                ).run()
+        if upserts:
+            await _upsert_entrants(upserts)
+
+
+async def load_entrants(message_id: int) -> Entrants:
+    """Load the entrants of a giveaway with their weights."""
+    rows = (
+        await GiveawayEntrant.select(GiveawayEntrant.user_id, GiveawayEntrant.weight)
+        .where(GiveawayEntrant.message_id == message_id)
+        .order_by(GiveawayEntrant.id)
+        .run()
+    )
+    return Entrants({row["user_id"]: row["weight"] for row in rows})
+
+
+async def load_entrants_bulk(message_ids: Iterable[int]) -> Dict[int, Entrants]:
+    """Load the entrants of many giveaways, querying chunks of message ids concurrently."""
+    message_ids = list(message_ids)
+    weights: Dict[int, Dict[int, int]] = {message_id: {} for message_id in message_ids}
+    chunks = [message_ids[i : i + IDS_PER_QUERY] for i in range(0, len(message_ids), IDS_PER_QUERY)]
+    results = await asyncio.gather(
+        *(
+            GiveawayEntrant.select(
+                GiveawayEntrant.message_id, GiveawayEntrant.user_id, GiveawayEntrant.weight
+            )
+            .where(GiveawayEntrant.message_id.is_in(chunk))
+            .order_by(GiveawayEntrant.id)
+            .run()
+            for chunk in chunks
+        )
+    )
+    for rows in results:
+        for row in rows:
+            weights[row["message_id"]][row["user_id"]] = row["weight"]
+    return {message_id: Entrants(users) for message_id, users in weights.items()}
+
+
+async def count_entrants(message_id: int) -> int:
+    return await GiveawayEntrant.count().where(GiveawayEntrant.message_id == message_id).run()
+
+
+async def delete_giveaways(message_ids: Iterable[int]) -> None:
+    """Delete the metadata and entrants of giveaways."""
+    message_ids = list(message_ids)
+    if not message_ids:
+        return
+    async with DB.transaction():
+        await GiveawayEntrant.delete().where(GiveawayEntrant.message_id.is_in(message_ids)).run()
+        await GiveawayEntry.delete().where(GiveawayEntry.message_id.is_in(message_ids)).run()
+        await GiveawayRecord.delete().where(GiveawayRecord.message_id.is_in(message_ids)).run()
+
+
+async def migrate_legacy_entrants(batch_size: int = 100) -> int:
+    """Move entrants out of the legacy ``GiveawayEntry.entrants`` arrays.
+
+    Rows are processed in batches, each batch in its own transaction. Migrated arrays are
+    emptied, so the migration is safe to run on every startup.
+    """
+    migrated = 0
+    last_id = 0
+    while True:
+        rows = (
+            await GiveawayEntry.select(GiveawayEntry.id, GiveawayEntry.message_id, GiveawayEntry.entrants)
+            .where(GiveawayEntry.id > last_id)
+            .order_by(GiveawayEntry.id)
+            .limit(batch_size)
+            .run()
+        )
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        rows = [row for row in rows if row["entrants"]]
+        if not rows:
+            continue
+        async with DB.transaction():
+            upserts = [
+                (row["message_id"], user_id, weight)
+                for row in rows
+                for user_id, weight in Counter(row["entrants"]).items()
+            ]
+            await _upsert_entrants(upserts, replace=False)
+            await GiveawayEntry.update({GiveawayEntry.entrants: []}).where(
+                GiveawayEntry.id.is_in([row["id"] for row in rows])
+            ).run()
+        migrated += len(rows)
+        log.info(f"Migrated entrants of {migrated} giveaways to the giveaway_entrant table")
+    return migrated
@@ -0,0 +1,116 @@
+import asyncio
+import contextlib
+import time
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+log = getLogger("red.flare.giveaways")
+
+
+class EntryWorkerPool:
+    """Bounded pool of workers processing giveaway entries.
+
+    Jobs wait in a queue holding at most ``max_queue`` entries and ``submit``
+    refuses new ones once it is full, so callers can shed load instead of
+    piling up coroutines. Queue depth and time spent waiting are tracked.
+    Jobs dropped when the pool closes are passed to ``on_drop``.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[..., Awaitable[Any]],
+        *,
+        on_drop: Optional[Callable[..., Awaitable[Any]]] = None,
+        workers: int = 8,
+        max_queue: int = 1000,
+    ) -> None:
+        self._handler = handler
+        self._on_drop = on_drop
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[asyncio.Task, tuple] = {}
+        self.processed = 0
+        self.rejected = 0
+        self.peak_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.processed if self.processed else 0.0
+
+    def start(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def resize(self, workers: int, max_queue: int) -> None:
+        """Change the worker count and queue limit, jobs already queued are kept."""
+        self.max_queue = max_queue
+        surplus = len([task for task in self._tasks if not task.done()]) - workers
+        self.workers = workers
+        # Surplus workers exit once they reach a sentinel, after finishing their current job.
+        for _ in range(max(0, surplus)):
+            self._queue.put_nowait(None)
+        self.start()
+
+    def submit(self, *args: Any) -> bool:
+        """Queue a job for the handler, returning False if the queue is full."""
+        if self.depth >= self.max_queue:
+            self.rejected += 1
+            return False
+        self._queue.put_nowait((time.monotonic(), args))
+        self.peak_depth = max(self.peak_depth, self.depth)
+        return True
+
+    async def close(self, timeout: float = 10) -> None:
+        """Drop queued jobs, give running ones ``timeout`` seconds, then stop the workers."""
+        dropped = []
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            if job is not None:
+                dropped.append(job[1])
+        tasks = list(self._tasks)
+        for _ in tasks:
+            self._queue.put_nowait(None)
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+                if task in self._running:
+                    dropped.append(self._running.pop(task))
+            for task in pending:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._tasks.clear()
+        if dropped and self._on_drop is not None:
+            results = await asyncio.gather(*(self._on_drop(*args) for args in dropped), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    log.error("Error answering a dropped giveaway entry: ", exc_info=result)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                self._tasks.remove(asyncio.current_task())
+                return
+            queued_at, args = job
+            waited = time.monotonic() - queued_at
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            task = asyncio.current_task()
+            self._running[task] = args
+            try:
+                await self._handler(*args)
+            except Exception as exc:
+                log.error("Error processing giveaway entry: ", exc_info=exc)
+            finally:
+                self._running.pop(task, None)
+                self.processed += 1
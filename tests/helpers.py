@@ -0,0 +1,35 @@
+import contextlib
+import importlib
+import sys
+import types
+from pathlib import Path
+
+GIVEAWAYS = Path(__file__).resolve().parent.parent / "giveaways"
+
+
+def load_giveaways_module(name: str):
+    """Import ``giveaways.<name>`` without running ``giveaways/__init__.py``.
+
+    The package ``__init__`` imports the cog, which needs a configured Red instance.
+    Modules loaded here only need their own imports to be installed.
+    """
+    if "giveaways" not in sys.modules:
+        package = types.ModuleType("giveaways")
+        package.__path__ = [str(GIVEAWAYS)]
+        sys.modules["giveaways"] = package
+    return importlib.import_module(f"giveaways.{name}")
+
+
+@contextlib.asynccontextmanager
+async def stub_server(handler):
+    """Serve ``handler`` for every path on a local port, yielding the running server."""
+    from aiohttp import test_utils, web
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    server = test_utils.TestServer(app)
+    await server.start_server()
+    try:
+        yield server
+    finally:
+        await server.close()
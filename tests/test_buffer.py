@@ -0,0 +1,81 @@
+import asyncio
+
+from helpers import load_giveaways_module
+
+buffer = load_giveaways_module("buffer")
+
+
+def test_close_keeps_a_write_in_progress():
+    async def run():
+        written = []
+        started = asyncio.Event()
+
+        async def writer(batch):
+            started.set()
+            await asyncio.sleep(0.05)
+            written.append(batch)
+
+        entrants = buffer.EntrantWriteBuffer(writer, interval=0.01)
+        entrants.start()
+        entrants.record(1, 10, 1)
+        await started.wait()
+        await entrants.close()
+        return written, len(entrants)
+
+    written, pending = asyncio.run(run())
+    assert written == [{1: {10: 1}}]
+    assert pending == 0
+
+
+def test_close_writes_what_is_left():
+    async def run():
+        written = []
+
+        async def writer(batch):
+            written.append(batch)
+
+        entrants = buffer.EntrantWriteBuffer(writer, interval=60)
+        entrants.start()
+        entrants.record(1, 10, 1)
+        entrants.record(1, 11, 0)
+        entrants.record(2, 10, 3)
+        await entrants.close()
+        return written
+
+    assert asyncio.run(run()) == [{1: {10: 1, 11: 0}, 2: {10: 3}}]
+
+
+def test_failed_write_is_kept_without_overwriting_newer_changes():
+    async def run():
+        entrants = None
+
+        async def writer(batch):
+            entrants.record(1, 10, 0)
+            raise OSError("disk full")
+
+        entrants = buffer.EntrantWriteBuffer(writer)
+        entrants.record(1, 10, 2)
+        entrants.record(1, 11, 1)
+        try:
+            await entrants.flush()
+        except OSError:
+            pass
+        return entrants._dirty
+
+    assert asyncio.run(run()) == {1: {10: 0, 11: 1}}
+
+
+def test_cancelled_write_is_kept():
+    async def run():
+        async def writer(batch):
+            await asyncio.sleep(10)
+
+        entrants = buffer.EntrantWriteBuffer(writer)
+        entrants.record(1, 10, 1)
+        task = asyncio.create_task(entrants.flush())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return entrants._dirty
+
+    assert asyncio.run(run()) == {1: {10: 1}}
@@ -0,0 +1,50 @@
+import asyncio
+
+from helpers import load_giveaways_module
+
+cache = load_giveaways_module("cache")
+
+
+def test_ttl_cache_expires_and_counts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl_cache = cache.TTLCache(maxsize=10, ttl=5)
+    ttl_cache.set("a", 1)
+    assert ttl_cache.get("a") == 1
+    now[0] += 6
+    assert ttl_cache.get("a") is None
+    assert (ttl_cache.hits, ttl_cache.misses) == (1, 1)
+    assert len(ttl_cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = cache.TTLCache(maxsize=2, ttl=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+
+
+def test_single_flight_collapses_concurrent_calls():
+    async def run():
+        flight = cache.SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+        again = await flight.do("key", fetch)
+        return flight, results, again
+
+    flight, results, again = asyncio.run(run())
+    assert results == [1] * 10
+    assert again == 2
+    assert (flight.calls, flight.collapsed) == (2, 9)
+    assert len(flight) == 0
@@ -0,0 +1,50 @@
+import os
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from helpers import load_giveaways_module
+
+weighted_sample = load_giveaways_module("draw").weighted_sample
+
+
+def test_single_winner_follows_weights():
+    rng = random.Random(1)
+    entrants = [(1, 1), (2, 3), (3, 6)]
+    trials = 20000
+    wins = Counter(weighted_sample(entrants, 1, rng)[0] for _ in range(trials))
+    for user_id, expected in ((1, 0.1), (2, 0.3), (3, 0.6)):
+        assert abs(wins[user_id] / trials - expected) < 0.015
+
+
+def test_winners_are_distinct():
+    rng = random.Random(2)
+    entrants = [(user_id, 1000 if user_id == 0 else 1) for user_id in range(10)]
+    for _ in range(200):
+        winners = weighted_sample(entrants, 5, rng)
+        assert len(winners) == 5
+        assert len(set(winners)) == 5
+
+
+def test_more_winners_than_entrants_returns_everyone():
+    assert sorted(weighted_sample([(1, 1), (2, 5)], 3, random.Random(3))) == [1, 2]
+
+
+def test_zero_weight_and_no_winners():
+    rng = random.Random(4)
+    assert weighted_sample([(1, 0), (2, 1)], 2, rng) == [2]
+    assert weighted_sample([(1, 1)], 0, rng) == []
+
+
+@pytest.mark.skipif(not os.environ.get("GIVEAWAYS_BENCHMARKS"), reason="set GIVEAWAYS_BENCHMARKS=1 to run benchmarks")
+def test_million_entrants_benchmark():
+    rng = random.Random(5)
+    entrants = [(user_id, user_id % 5 + 1) for user_id in range(1_000_000)]
+    start = time.perf_counter()
+    winners = weighted_sample(entrants, 10, rng)
+    elapsed = time.perf_counter() - start
+    assert len(set(winners)) == 10
+    # Generous bound, only meant to catch a return to quadratic behaviour.
+    assert elapsed < 10
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("discord")
+pytest.importorskip("redbot")
+
+import aiohttp
+from aiohttp import web
+
+from helpers import load_giveaways_module, stub_server
+
+http_client = load_giveaways_module("http_client")
+objects = load_giveaways_module("objects")
+
+POLICIES = {"test": http_client.ProviderPolicy(rate=1000, burst=100, concurrency=4)}
+
+
+def serve(*responses):
+    """Handler answering with ``responses`` in turn, repeating the last one, and recording each hit."""
+    hits = []
+
+    async def handler(request):
+        hits.append(time.monotonic())
+        status, headers = responses[min(len(hits), len(responses)) - 1]
+        if status == 200:
+            return web.json_response({"ok": True})
+        return web.Response(status=status, headers=headers)
+
+    return handler, hits
+
+
+async def fetch(handler, calls=1, setup=None):
+    async with stub_server(handler) as server, aiohttp.ClientSession() as session:
+        http = http_client.ProviderHttp(session, POLICIES)
+        if setup is not None:
+            setup(http)
+        results = []
+        for _ in range(calls):
+            try:
+                results.append(await http.get_json("test", str(server.make_url("/"))))
+            except objects.ProviderUnavailableError as exc:
+                results.append(exc)
+        return http, results
+
+
+def test_rate_limit_waits_for_retry_after():
+    handler, hits = serve((429, {"Retry-After": "0.2"}), (200, {}))
+    http, results = asyncio.run(fetch(handler))
+    assert results == [{"ok": True}]
+    assert len(hits) == 2
+    assert hits[1] - hits[0] >= 0.19
+    assert http.throttled["test"] == 1
+    assert http.breakers["test"].failures == 0
+
+
+def test_rate_limit_gives_up_after_retries():
+    handler, hits = serve((429, {"Retry-After": "0.01"}))
+    http, results = asyncio.run(fetch(handler))
+    assert results == [None]
+    assert len(hits) == http_client.MAX_RETRIES + 1
+    assert http.breakers["test"].failures == 1
+
+
+def test_long_retry_after_is_not_waited_out():
+    handler, hits = serve((429, {"Retry-After": str(http_client.MAX_RETRY_AFTER + 1)}))
+    http, results = asyncio.run(fetch(handler))
+    assert results == [None]
+    assert len(hits) == 1
+
+
+def test_server_errors_open_the_breaker():
+    handler, hits = serve((500, {}))
+    http, results = asyncio.run(fetch(handler, calls=7))
+    threshold = http.breakers["test"].threshold
+    assert results[:threshold] == [None] * threshold
+    assert all(isinstance(result, objects.ProviderUnavailableError) for result in results[threshold:])
+    assert len(hits) == threshold
+    assert http.breakers["test"].state == "open"
+    assert http.rejected["test"] == 7 - threshold
+
+
+def test_probe_closes_the_breaker_once_the_server_recovers():
+    handler, hits = serve((500, {}), (200, {}))
+
+    def setup(http):
+        breaker = http.breakers["test"]
+        breaker.threshold = 1
+        breaker.reset_after = 0
+
+    http, results = asyncio.run(fetch(handler, calls=2, setup=setup))
+    assert results == [None, {"ok": True}]
+    assert http.breakers["test"].state == "closed"
+
+
+def test_client_errors_do_not_count_as_failures():
+    handler, hits = serve((404, {}))
+    http, results = asyncio.run(fetch(handler, calls=10))
+    assert results == [None] * 10
+    assert http.breakers["test"].state == "closed"
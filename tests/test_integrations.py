@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("discord")
+pytest.importorskip("redbot")
+
+import aiohttp
+from aiohttp import web
+
+from helpers import load_giveaways_module, stub_server
+
+http_client = load_giveaways_module("http_client")
+integrations = load_giveaways_module("integrations")
+
+POLICIES = {"mee6": http_client.ProviderPolicy(rate=1000, burst=100, concurrency=4)}
+
+
+class FakeMee6:
+    """Leaderboard server holding ``{guild_id: [(user_id, level), ...]}``."""
+
+    def __init__(self, leaderboards):
+        self.leaderboards = leaderboards
+        self.requests = []
+        self.down = False
+        self.failing_page = None
+
+    async def handler(self, request):
+        guild = int(request.query["guild"])
+        page = int(request.query["page"])
+        limit = int(request.query["limit"])
+        self.requests.append((guild, page))
+        if self.down or page == self.failing_page:
+            return web.Response(status=503)
+        players = self.leaderboards.get(guild, [])[page * limit : (page + 1) * limit]
+        # MEE6 sends user ids as strings.
+        return web.json_response({"players": [{"id": str(user), "level": level} for user, level in players]})
+
+
+async def with_leaderboards(fake, test, **kwargs):
+    async with stub_server(fake.handler) as server, aiohttp.ClientSession() as session:
+        http = http_client.ProviderHttp(session, POLICIES)
+        boards = integrations.Mee6Leaderboards(http, base_url=str(server.make_url("/leaderboard")), **kwargs)
+        try:
+            return await test(http, boards)
+        finally:
+            await boards.close()
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(integrations, "MEE6_PAGE_SIZE", 2)
+
+
+def test_levels_are_paged_until_a_short_page(small_pages):
+    fake = FakeMee6({1: [(10, 5), (11, 4), (12, 3), (13, 2), (14, 1)]})
+
+    async def test(http, boards):
+        return await integrations.get_mee6_levels(http, 1, boards.base_url)
+
+    levels = asyncio.run(with_leaderboards(fake, test))
+    assert levels == {10: 5, 11: 4, 12: 3, 13: 2, 14: 1}
+    assert fake.requests == [(1, 0), (1, 1), (1, 2)]
+
+
+def test_failed_page_fails_the_whole_leaderboard(small_pages):
+    fake = FakeMee6({1: [(10, 5), (11, 4), (12, 3)]})
+    fake.failing_page = 1
+
+    async def test(http, boards):
+        return await integrations.get_mee6_levels(http, 1, boards.base_url)
+
+    assert asyncio.run(with_leaderboards(fake, test)) is None
+
+
+def test_levels_are_answered_from_the_index():
+    fake = FakeMee6({1: [(10, 5), (11, 4)], 2: [(10, 9)]})
+
+    async def test(http, boards):
+        first = await asyncio.gather(*(boards.level(1, 10) for _ in range(5)))
+        return first, await boards.level(1, 11), await boards.level(1, 99), await boards.level(2, 10)
+
+    first, other, missing, other_guild = asyncio.run(with_leaderboards(fake, test))
+    assert first == [5] * 5
+    assert (other, missing, other_guild) == (4, 0, 9)
+    # Concurrent misses share one fetch, later lookups do not hit the server.
+    assert fake.requests == [(1, 0), (2, 0)]
+
+
+def test_unavailable_leaderboard_returns_none():
+    fake = FakeMee6({1: [(10, 5)]})
+    fake.down = True
+
+    async def test(http, boards):
+        return await boards.level(1, 10)
+
+    assert asyncio.run(with_leaderboards(fake, test)) is None
+
+
+def test_background_refresh_updates_and_keeps_snapshots():
+    fake = FakeMee6({1: [(10, 5)]})
+
+    async def test(http, boards):
+        boards.start()
+        before = await boards.level(1, 10)
+        fake.leaderboards[1] = [(10, 6)]
+        await asyncio.sleep(0.15)
+        refreshed = await boards.level(1, 10)
+        fake.down = True
+        await asyncio.sleep(0.15)
+        return before, refreshed, await boards.level(1, 10)
+
+    assert asyncio.run(with_leaderboards(fake, test, interval=0.05)) == (5, 6, 6)
+
+
+def test_idle_guilds_are_evicted():
+    fake = FakeMee6({1: [(10, 5)]})
+
+    async def test(http, boards):
+        boards.start()
+        await boards.level(1, 10)
+        tracked = len(boards)
+        await asyncio.sleep(0.15)
+        return tracked, len(boards), len(fake.requests)
+
+    tracked, remaining, requests = asyncio.run(with_leaderboards(fake, test, interval=0.05, idle_after=0.01))
+    assert (tracked, remaining, requests) == (1, 0, 1)
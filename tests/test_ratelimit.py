@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from helpers import load_giveaways_module
+
+ratelimit = load_giveaways_module("ratelimit")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = ratelimit.CircuitBreaker(threshold=3, reset_after=30)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = ratelimit.CircuitBreaker(threshold=2, reset_after=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_lets_one_probe_through(clock):
+    breaker = ratelimit.CircuitBreaker(threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = ratelimit.CircuitBreaker(threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_breaker_lost_probe_expires(clock):
+    breaker = ratelimit.CircuitBreaker(threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_bucket_allows_burst_then_limits_rate():
+    async def run():
+        bucket = ratelimit.TokenBucket(rate=50, capacity=5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(5):
+            await bucket.acquire()
+        burst = loop.time() - start
+        for _ in range(5):
+            await bucket.acquire()
+        return burst, loop.time() - start
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.02
+    # Five more tokens at 50 a second take about 0.1s.
+    assert 0.08 <= total < 0.5
+
+
+def test_bucket_pause_holds_tokens_back():
+    async def run():
+        bucket = ratelimit.TokenBucket(rate=1000, capacity=5)
+        bucket.pause(0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await bucket.acquire()
+        return loop.time() - start
+
+    assert 0.09 <= asyncio.run(run()) < 0.5
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from helpers import load_giveaways_module
+
+GiveawayScheduler = load_giveaways_module("scheduler").GiveawayScheduler
+
+
+def at(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def test_pop_due_in_deadline_order():
+    scheduler = GiveawayScheduler()
+    scheduler.schedule(1, at(30))
+    scheduler.schedule(2, at(10))
+    scheduler.schedule(3, at(20))
+    assert scheduler.next_deadline() == 10
+    assert scheduler.pop_due(now=25) == [2, 3]
+    assert len(scheduler) == 1
+    assert scheduler.pop_due(now=25) == []
+
+
+def test_reschedule_replaces_old_deadline():
+    scheduler = GiveawayScheduler()
+    scheduler.schedule(1, at(10))
+    scheduler.schedule(1, at(50))
+    assert scheduler.pop_due(now=20) == []
+    assert scheduler.next_deadline() == 50
+    assert scheduler.pop_due(now=50) == [1]
+
+
+def test_cancel_removes_giveaway():
+    scheduler = GiveawayScheduler()
+    scheduler.schedule(1, at(10))
+    scheduler.schedule(2, at(20))
+    scheduler.cancel(1)
+    assert 1 not in scheduler
+    assert scheduler.pop_due(now=30) == [2]
+    assert scheduler.next_deadline() is None
+
+
+def test_stale_entries_are_compacted():
+    scheduler = GiveawayScheduler()
+    for deadline in range(1000):
+        scheduler.schedule(1, at(deadline))
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 65
+    assert scheduler.pop_due(now=999) == [1]
+
+
+def test_wait_for_due_wakes_for_earlier_deadline():
+    async def run():
+        scheduler = GiveawayScheduler()
+        now = datetime.now(timezone.utc)
+        scheduler.schedule(1, now + timedelta(hours=1))
+        waiter = asyncio.create_task(scheduler.wait_for_due())
+        await asyncio.sleep(0.01)
+        scheduler.schedule(2, now + timedelta(milliseconds=50))
+        start = time.monotonic()
+        due = await asyncio.wait_for(waiter, timeout=2)
+        return due, time.monotonic() - start
+
+    due, waited = asyncio.run(run())
+    assert due == [2]
+    assert waited < 1